@@ -0,0 +1,272 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+from collections import deque
+from market_data import fetch_many, fetch_latest_many
+from live import TickerWatch
+
+# 알림 엔진 기본값
+POLL_SECONDS = 60
+# 엔진이 (조회 작업 스레드 포함) 쓸 수 있는 CPU 비율 (코어 1개 기준, 초과하면 다음 주기를 늦춤)
+CPU_BUDGET = 0.25
+FEED_SIZE = 200
+WEBHOOK_TIMEOUT = 5
+
+
+# 기본 알림 기록 파일 (봉 저장소 옆)
+def default_log_path():
+    import bar_store
+
+    return os.path.join(bar_store.STORE_DIR, "alerts.jsonl")
+
+
+# 파일에 한 줄에 하나씩 JSON 기록
+class LogSink:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def emit(self, events):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+
+# 웹훅으로 POST (본문: {"events": [...]}), 슬랙/디스코드 중계 서버나 로컬 HTTP 스텁 등
+class WebhookSink:
+    def __init__(self, url, timeout=WEBHOOK_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+
+    def emit(self, events):
+        body = json.dumps({"events": events}, ensure_ascii=False).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body, method="POST",
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+# 앱 화면용 최근 알림 (최신순)
+class FeedSink:
+    def __init__(self, maxlen=FEED_SIZE):
+        self.events = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def emit(self, events):
+        with self._lock:
+            for event in events:
+                self.events.appendleft(event)
+
+    def recent(self):
+        with self._lock:
+            return list(self.events)
+
+
+# 관심종목 전체를 새 봉마다 증분 평가해 새로 생긴 신호만 sinks로 전달
+# params: k_period, d_period, smooth_k, rsi_period, oversold, overbought
+class AlertEngine:
+    def __init__(self, tickers, timeframe, params, sinks, poll_seconds=POLL_SECONDS,
+                 cpu_budget=CPU_BUDGET):
+        self.tickers = list(dict.fromkeys(tickers))
+        self.timeframe = timeframe
+        self.params = dict(params)
+        self.sinks = list(sinks)
+        self.poll_seconds = poll_seconds
+        self.cpu_budget = cpu_budget
+        self.watches = {}
+        self.names = {}
+        self.errors = {}
+        self.sink_errors = {}
+        self.last_cycle = None
+        self.cycle_cpu = 0.0
+        self._sent = deque(maxlen=10000)
+        self._sent_keys = set()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # 아직 상태가 없는 종목은 전체 봉으로 초기화 (실패한 종목은 다음 주기에 재시도)
+    def _seed(self, cpu):
+        missing = [ticker for ticker in self.tickers if ticker not in self.watches]
+        if not missing:
+            return
+        results, errors = fetch_many(missing, self.timeframe, cpu=cpu)
+        p = self.params
+        for ticker, (df, name, source, currency) in results.items():
+            if len(df) > 1:
+                self.watches[ticker] = TickerWatch(df, p['k_period'], p['d_period'], p['smooth_k'],
+                                                   p['rsi_period'], p['oversold'], p['overbought'])
+                self.names[ticker] = name
+        self.errors.update(errors)
+
+    def _event(self, ticker, row):
+        return {
+            'ticker': ticker, 'name': self.names.get(ticker, ticker), 'timeframe': self.timeframe,
+            'time': str(row['time']), 'signal': row['signal'], 'close': float(row['Close']),
+            '%K': float(row['%K']), '%D': float(row['%D']), 'RSI': float(row['RSI']),
+        }
+
+    # 같은 (종목, 봉, 신호)는 한 번만
+    def _is_new(self, event):
+        key = (event['ticker'], event['timeframe'], event['time'], event['signal'])
+        if key in self._sent_keys:
+            return False
+        if len(self._sent) == self._sent.maxlen:
+            self._sent_keys.discard(self._sent[0])
+        self._sent.append(key)
+        self._sent_keys.add(key)
+        return True
+
+    def _emit(self, events):
+        for sink in self.sinks:
+            try:
+                sink.emit(events)
+            except Exception as e:
+                self.sink_errors[type(sink).__name__] = str(e) or type(e).__name__
+
+    # 한 주기: 새 봉 조회 → 확정된 봉만 증분 반영 → 새 신호 전달
+    # cycle_cpu: 엔진 스레드 + 조회 작업 스레드(조회/파싱/집계/압축) CPU 시간 합계
+    # 반환: 이번에 보낸 알림 목록
+    def run_once(self):
+        start_cpu = time.thread_time()
+        cpu = []
+        self._seed(cpu)
+        latest, errors = fetch_latest_many(
+            {ticker: watch.last_closed for ticker, watch in self.watches.items()}, self.timeframe, cpu=cpu)
+        self.errors = errors
+
+        events = []
+        for ticker, new_bars in latest.items():
+            changed, rows = self.watches[ticker].update(new_bars)
+            events.extend(event for event in (self._event(ticker, row) for row in rows)
+                          if self._is_new(event))
+        if events:
+            self._emit(events)
+        self.cycle_cpu = time.thread_time() - start_cpu + sum(cpu)
+        self.last_cycle = time.time()
+        return events
+
+    def _loop(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.run_once()
+            except Exception as e:
+                self.errors['*'] = str(e) or type(e).__name__
+            # CPU 사용량이 예산을 넘으면 그만큼 다음 주기를 늦춤
+            wait = max(self.poll_seconds, self.cycle_cpu / self.cpu_budget) - (time.monotonic() - started)
+            self._stop.wait(max(wait, 0))
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+
+# 프로세스 전체 엔진 (설정별 1개, 세션이 닫혀도 계속 동작)
+_engines = {}
+# 엔진 키 → 그 엔진을 쓰는 구독자(세션) id 집합, 마지막 구독자가 놓을 때만 엔진을 멈춤
+_owners = {}
+_lock = threading.Lock()
+
+
+def engine_key(tickers, timeframe, params, webhook_url=None, log_path=None, poll_seconds=POLL_SECONDS):
+    return (tuple(dict.fromkeys(tickers)), timeframe, tuple(sorted(params.items())), webhook_url, log_path,
+            poll_seconds)
+
+
+# 같은 설정의 엔진이 있으면 재사용, 없으면 만들어 시작 (owner를 구독자로 등록, 여러 번 불러도 한 번만 셈)
+def ensure_engine(owner, tickers, timeframe, params, webhook_url=None, log_path=None,
+                  poll_seconds=POLL_SECONDS, **kwargs):
+    key = engine_key(tickers, timeframe, params, webhook_url, log_path, poll_seconds)
+    with _lock:
+        engine = _engines.get(key)
+        if engine is None:
+            sinks = [FeedSink()]
+            if log_path:
+                sinks.append(LogSink(log_path))
+            if webhook_url:
+                sinks.append(WebhookSink(webhook_url))
+            engine = AlertEngine(tickers, timeframe, params, sinks, poll_seconds, **kwargs)
+            _engines[key] = engine
+        _owners.setdefault(key, set()).add(owner)
+        engine.start()
+    return key, engine
+
+
+# owner의 구독 해제, 남은 구독자가 없으면 엔진을 멈추고 제거
+def release_engine(key, owner):
+    engine = None
+    with _lock:
+        owners = _owners.get(key)
+        if owners is not None:
+            owners.discard(owner)
+            if not owners:
+                del _owners[key]
+                engine = _engines.pop(key, None)
+    if engine is not None:
+        engine.stop()
+
+
+def feed(engine):
+    for sink in engine.sinks:
+        if isinstance(sink, FeedSink):
+            return sink.recent()
+    return []
+
+
+def main(argv=None):
+    from scan import DEFAULT_PARAMS
+    from watchlist import load_watchlist, select, parse_tickers
+
+    parser = argparse.ArgumentParser(description="관심종목 스토캐스틱 신호 알림 (새 봉마다 증분 평가)")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--tickers', help="쉼표로 구분한 종목코드")
+    source.add_argument('--sheet', help="종목코드/테마 컬럼이 있는 구글 시트 URL 또는 CSV 경로")
+    parser.add_argument('--themes', help="시트에서 사용할 테마 (쉼표 구분, 기본: 전체)")
+    parser.add_argument('--timeframe', default="1m")
+    parser.add_argument('--webhook', help="알림을 POST할 URL")
+    parser.add_argument('--log', default=default_log_path(), help="알림 기록 파일 (JSON Lines)")
+    parser.add_argument('--poll', type=float, default=POLL_SECONDS, help="조회 주기(초)")
+    parser.add_argument('--cpu-budget', type=float, default=CPU_BUDGET, help="CPU 사용 비율 상한 (0~1)")
+    parser.add_argument('--once', action='store_true', help="한 주기만 실행")
+    args = parser.parse_args(argv)
+
+    if args.tickers:
+        tickers = parse_tickers(args.tickers)
+    else:
+        themes = [t.strip() for t in args.themes.split(',')] if args.themes else None
+        tickers = select(load_watchlist(args.sheet), themes)
+
+    sinks = [LogSink(args.log)]
+    if args.webhook:
+        sinks.append(WebhookSink(args.webhook))
+    engine = AlertEngine(tickers, args.timeframe, DEFAULT_PARAMS, sinks, args.poll, args.cpu_budget)
+    if args.once:
+        events = engine.run_once()
+        print(f"{len(engine.watches)}개 종목 평가, 알림 {len(events)}건")
+        return 0
+
+    engine.start()
+    try:
+        while engine.running:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        engine.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
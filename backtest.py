@@ -0,0 +1,96 @@
+import numpy as np
+
+INITIAL_CAPITAL = 10000000
+
+
+# 배열 기반 백테스트 (전액 매수/전량 매도, 종가 체결)
+# commission: 매수/매도 금액 대비 수수료율, slippage: 체결가 불리하게 밀리는 비율
+def backtest_arrays(close, buy, sell, commission=0.0, slippage=0.0,
+                    initial_capital=INITIAL_CAPITAL):
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    buy_bars = np.flatnonzero(np.asarray(buy, dtype=bool))
+    sell_bars = np.flatnonzero(np.asarray(sell, dtype=bool))
+
+    buy_cost = 1 + commission
+    sell_gain = 1 - commission
+    shares_delta = np.zeros(n)
+    cash_delta = np.zeros(n)
+    profits = []
+
+    # 신호 수만큼만 반복: 미보유면 다음 매수 신호에서 진입, 보유 중이면 그 뒤 첫 매도 신호에서 청산
+    # (보유 중 매수 신호, 미보유 중 매도 신호는 무시)
+    capital = float(initial_capital)
+    open_at_end = False
+    next_bar = 0
+    while True:
+        i = np.searchsorted(buy_bars, next_bar)
+        if i >= len(buy_bars):
+            break
+        entry = buy_bars[i]
+        buy_fill = close[entry] * (1 + slippage)
+        shares = capital // (buy_fill * buy_cost)
+        if shares <= 0:
+            # 1주도 못 사면 이 신호는 건너뛰고 다음 매수 신호에서 다시 시도
+            next_bar = entry + 1
+            continue
+        capital -= shares * buy_fill * buy_cost
+        shares_delta[entry] += shares
+        cash_delta[entry] -= shares * buy_fill * buy_cost
+
+        j = np.searchsorted(sell_bars, entry, side='right')
+        if j >= len(sell_bars):
+            # 기간 종료 시 보유분은 마지막 종가로 평가 (청산 비용 포함, 자산 곡선 마지막 값도 동일)
+            proceeds = shares * close[-1] * (1 - slippage) * sell_gain
+            capital += proceeds
+            shares_delta[-1] -= shares
+            cash_delta[-1] += proceeds
+            open_at_end = True
+            break
+        exit_bar = sell_bars[j]
+        sell_fill = close[exit_bar] * (1 - slippage)
+        capital += shares * sell_fill * sell_gain
+        shares_delta[exit_bar] -= shares
+        cash_delta[exit_bar] += shares * sell_fill * sell_gain
+        profits.append((sell_fill * sell_gain - buy_fill * buy_cost) / (buy_fill * buy_cost) * 100)
+        next_bar = exit_bar + 1
+    profits = np.array(profits)
+
+    held = np.cumsum(shares_delta)
+    equity_curve = initial_capital + np.cumsum(cash_delta) + held * close
+
+    total_return = (capital - initial_capital) / initial_capital * 100
+    if len(profits):
+        wins = profits[profits > 0]
+        losses = profits[profits <= 0]
+        win_rate = len(wins) / len(profits) * 100
+        avg_win = wins.mean() if len(wins) else 0
+        avg_loss = abs(losses.mean()) if len(losses) else 1
+        profit_loss_ratio = avg_win / avg_loss if avg_loss > 0 else 0
+        peak = np.maximum.accumulate(equity_curve)
+        max_dd = float(((peak - equity_curve) / peak * 100).max())
+    else:
+        win_rate = 0
+        profit_loss_ratio = 0
+        max_dd = 0
+
+    return {
+        'total_return': total_return,
+        'win_rate': win_rate,
+        'profit_loss_ratio': profit_loss_ratio,
+        'max_drawdown': max_dd,
+        'total_trades': len(profits),
+        'equity_curve': equity_curve,
+        # 청산된 거래별 수익률 (비율, 수수료/슬리피지 반영, 거래 순서대로)
+        'trade_returns': profits / 100,
+        # 기간 끝까지 보유해 마지막 종가로 청산한 포지션 여부 (total_trades에는 포함 안 됨)
+        'open_at_end': open_at_end
+    }
+
+
+# 백테스팅
+def run_backtest(df, signal_df, commission=0.0, slippage=0.0, initial_capital=INITIAL_CAPITAL):
+    return backtest_arrays(signal_df['Close'].to_numpy(),
+                           ~signal_df['Buy_Signal'].isna().to_numpy(),
+                           ~signal_df['Sell_Signal'].isna().to_numpy(),
+                           commission, slippage, initial_capital)
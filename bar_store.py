@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+import pandas as pd
+from compact import FrameLRU
+
+# 봉 데이터 저장 위치 (종목/봉 단위 Parquet 파일)
+STORE_DIR = os.environ.get(
+    "STOCK_BAR_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".bar_store"),
+)
+
+
+# root: 다른 봉 보관소(기록/재생용 아카이브 등), None이면 STORE_DIR
+def _bar_path(symbol, interval, root=None):
+    return os.path.join(root or STORE_DIR, interval, f"{symbol}.parquet")
+
+
+# "7d", "730d", "2y", "3mo" 형태의 기간 문자열 → timedelta
+def period_to_timedelta(period):
+    if period.endswith("mo"):
+        return pd.Timedelta(days=31 * int(period[:-2]))
+    if period.endswith("y"):
+        return pd.Timedelta(days=366 * int(period[:-1]))
+    if period.endswith("d"):
+        return pd.Timedelta(days=int(period[:-1]))
+    raise ValueError(f"지원하지 않는 기간: {period}")
+
+
+def has_bars(symbol, interval, root=None):
+    return os.path.exists(_bar_path(symbol, interval, root))
+
+
+# 마지막 갱신 후 지난 시간(초), 저장된 봉이 없으면 None
+# (파일 수정 시각 기준이라 같은 저장소를 쓰는 프로세스끼리 공유됨)
+def bar_age(symbol, interval, root=None):
+    try:
+        return time.time() - os.path.getmtime(_bar_path(symbol, interval, root))
+    except OSError:
+        return None
+
+
+# 갱신을 시도했음을 기록 (새 봉이 없거나 네트워크 실패여도 갱신 주기 동안 재요청하지 않음)
+def mark_checked(symbol, interval, root=None):
+    try:
+        os.utime(_bar_path(symbol, interval, root))
+    except OSError:
+        pass
+
+
+# 읽은 파일은 (경로, 수정 시각)별로 메모리에 보관 → 바뀌지 않았으면 다시 읽지 않음
+_loaded = FrameLRU(512)
+
+
+# 읽은 파일 메모리 캐시 비우기 (벤치마크에서 디스크 읽기 측정용)
+def clear_loaded():
+    _loaded.clear()
+
+
+def load_bars(symbol, interval, root=None):
+    path = _bar_path(symbol, interval, root)
+    try:
+        key = (path, os.stat(path).st_mtime_ns)
+    except OSError:
+        return None
+    df = _loaded.get(key)
+    if df is not None:
+        return df
+    try:
+        df = pd.read_parquet(path)
+    except Exception:
+        return None
+    _loaded.put(key, df)
+    return df
+
+
+# 임시 파일에 쓰고 교체 (동시에 읽는 세션이 깨진 파일을 보지 않도록)
+def save_bars(symbol, interval, df, root=None):
+    path = _bar_path(symbol, interval, root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    df.to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+
+
+# 기존 봉 + 새 봉 병합 (겹치는 시점은 새 값 우선: 진행 중이던 마지막 봉 갱신)
+def merge_bars(old, new):
+    if old is None or old.empty:
+        return new
+    if new is None or new.empty:
+        return old
+    df = pd.concat([old, new])
+    df = df[~df.index.duplicated(keep="last")]
+    return df.sort_index()
+
+
+# 배당/분할이 새로 생기면 수정주가 전체가 바뀌므로 증분 병합 불가
+# 저장된 마지막 봉과 겹치는 봉도 확인 (확정되면서 같은 봉에 배당/분할이 붙는 경우),
+# 저장된 봉에 이미 같은 값이 기록돼 있으면 새 이벤트가 아님
+def _has_corporate_action(stored, new):
+    overlap = new[new.index >= stored.index[-1]]
+    for col in ("Dividends", "Stock Splits"):
+        if col not in overlap.columns:
+            continue
+        values = overlap[col].fillna(0)
+        if col in stored.columns:
+            known = stored[col].reindex(overlap.index).fillna(0)
+        else:
+            known = 0
+        if ((values != 0) & (values != known)).any():
+            return True
+    return False
+
+
+# 저장된 봉 이후만 받아서 갱신
+# fetch(start): start가 None이면 period 전체, 아니면 start 시점부터 조회
+def refresh_bars(symbol, interval, period, fetch):
+    stored = load_bars(symbol, interval)
+    window = period_to_timedelta(period)
+
+    if stored is None or stored.empty:
+        df = fetch(None)
+    else:
+        last_ts = stored.index[-1]
+        now = pd.Timestamp.now(tz=last_ts.tz)
+        if last_ts < now - window:
+            # 너무 오래돼서 증분 조회 범위를 벗어남 → 전체 재조회
+            df = merge_bars(stored, fetch(None))
+        else:
+            try:
+                new = fetch(last_ts)
+            except Exception:
+                # 네트워크 실패 시 저장된 봉이라도 사용
+                return stored
+            if new is not None and not new.empty and _has_corporate_action(stored, new):
+                df = fetch(None)
+            else:
+                df = merge_bars(stored, new)
+
+    if df is None or df.empty:
+        return df
+    save_bars(symbol, interval, df)
+    return df
+
+
+# 조회 기간(period)만큼 잘라서 반환
+# 마지막 봉 기준 (실시간 데이터는 현재 시각과 같고, 재생용 과거 데이터도 기간만큼 보임)
+def trim_to_period(df, period):
+    if df is None or df.empty:
+        return df
+    cutoff = df.index[-1] - period_to_timedelta(period)
+    return df[df.index >= cutoff]
@@ -0,0 +1,188 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from indicators import add_moving_averages, calculate_stochastic, calculate_rsi
+from signals import add_signals
+from backtest import run_backtest
+from charts import build_stock_chart
+from screener import screen
+from portfolio import simulate_portfolio
+from providers import ArchiveProvider
+from compact import compact_bars
+import bar_store
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+
+# 기준 대비 이만큼 느려지면 회귀로 표시
+DEFAULT_TOLERANCE = 0.25
+
+PARAMS = {'k_period': 8, 'd_period': 5, 'smooth_k': 5, 'rsi_period': 14,
+          'oversold': 25, 'overbought': 75}
+
+
+# 합성 OHLCV (로그 랜덤워크, 같은 seed면 같은 데이터)
+def synthetic_ohlcv(n_bars, seed=0, freq="1min", start="2020-01-02 09:00"):
+    rng = np.random.default_rng(seed)
+    close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.002, n_bars)))
+    spread = close * rng.uniform(0.0005, 0.01, n_bars)
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) + spread,
+        'Low': np.minimum(open_, close) - spread,
+        'Close': close,
+        'Volume': rng.integers(100, 100000, n_bars).astype(np.float64),
+    }, index=pd.date_range(start, periods=n_bars, freq=freq, tz="Asia/Seoul"))
+
+
+# 임시 봉 아카이브에 저장 (data 단계 입력, 반환 객체가 사라지면 폴더도 삭제)
+def _archive(frames):
+    root = tempfile.TemporaryDirectory(prefix="bench_archive_")
+    for ticker, df in frames.items():
+        bar_store.save_bars(ticker, "1m", df, root.name)
+    return root, ArchiveProvider(root.name), list(frames)
+
+
+# 아카이브 읽기(Parquet) → 캐시용 압축 (매번 메모리 캐시를 비워 디스크에서 읽음)
+def _load_archive(archive):
+    root, provider, tickers = archive
+    bar_store.clear_loaded()
+    return [compact_bars(provider.history(ticker, "1m")) for ticker in tickers]
+
+
+def _indicators(df):
+    df = add_moving_averages(df.copy())
+    df = calculate_stochastic(df, PARAMS['k_period'], PARAMS['d_period'], PARAMS['smooth_k'])
+    return calculate_rsi(df, PARAMS['rsi_period'])
+
+
+# 단계별 준비(측정 제외)와 실행(측정) 함수
+# 종목별 단계는 종목 수만큼 반복, 전체 단계는 모든 종목을 한 번에 처리
+STAGES = {
+    'data': (_archive, _load_archive),
+    'indicators': (lambda frames: frames,
+                   lambda frames: [_indicators(df) for df in frames.values()]),
+    'signals': (lambda frames: {t: _indicators(df) for t, df in frames.items()},
+                lambda frames: [add_signals(df, PARAMS['oversold'], PARAMS['overbought'])
+                                for df in frames.values()]),
+    'backtest': (lambda frames: {t: add_signals(_indicators(df), PARAMS['oversold'], PARAMS['overbought'])
+                                 for t, df in frames.items()},
+                 lambda frames: [run_backtest(df, df) for df in frames.values()]),
+    'chart': (lambda frames: {t: add_signals(_indicators(df), PARAMS['oversold'], PARAMS['overbought'])
+                              for t, df in frames.items()},
+              lambda frames: [build_stock_chart(df, PARAMS['oversold'], PARAMS['overbought'], "KRW").to_json()
+                              for df in frames.values()]),
+    'screener': (lambda frames: frames,
+                 lambda frames: screen(frames, **PARAMS)),
+    'portfolio': (lambda frames: {t: add_signals(_indicators(df), PARAMS['oversold'], PARAMS['overbought'])
+                                  for t, df in frames.items()},
+                  lambda frames: simulate_portfolio(frames)),
+}
+
+
+# 한 단계 측정: repeat회 중 최단 시간, 마지막 실행의 최대 추가 메모리
+def measure(stage, frames, repeat):
+    prepare, run = STAGES[stage]
+    inputs = prepare(frames)
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run(inputs)
+        best = min(best, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    run(inputs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total_bars = sum(len(df) for df in frames.values())
+    return {'seconds': best, 'bars_per_sec': total_bars / best if best > 0 else float('inf'),
+            'peak_mb': peak / 1024 / 1024}
+
+
+def run_suite(bar_counts, ticker_counts, stages, repeat=3):
+    results = {}
+    for n_bars in bar_counts:
+        for n_tickers in ticker_counts:
+            frames = {f"T{i:04d}": synthetic_ohlcv(n_bars, seed=i) for i in range(n_tickers)}
+            for stage in stages:
+                key = f"{stage}|bars={n_bars}|tickers={n_tickers}"
+                results[key] = measure(stage, frames, repeat)
+                print(f"{key:<45} {results[key]['seconds'] * 1000:>10.1f} ms "
+                      f"{results[key]['bars_per_sec']:>14,.0f} bars/s "
+                      f"{results[key]['peak_mb']:>9.1f} MB", flush=True)
+    return results
+
+
+# 기준 결과와 비교 → 회귀 목록
+def compare(results, baseline, tolerance):
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get('results', {}).get(key)
+        if not base:
+            continue
+        ratio = result['seconds'] / base['seconds'] if base['seconds'] > 0 else 1.0
+        if ratio > 1 + tolerance:
+            regressions.append((key, base['seconds'], result['seconds'], ratio))
+    return regressions
+
+
+def _int_list(text):
+    return [int(value) for value in text.split(',') if value.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="데이터→지표→신호→백테스트→차트 단계별 벤치마크")
+    parser.add_argument('--bars', type=_int_list, default=[1000, 100000],
+                        help="종목당 봉 수 목록 (쉼표 구분, 예: 1000,100000,1000000)")
+    parser.add_argument('--tickers', type=_int_list, default=[1, 20],
+                        help="종목 수 목록 (쉼표 구분, 예: 1,100,2000)")
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help=f"측정 단계 (쉼표 구분, 기본: {','.join(STAGES)})")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="기준 결과 JSON 경로")
+    parser.add_argument('--save-baseline', action='store_true', help="이번 결과를 기준으로 저장")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="회귀 판정 허용 비율 (0.25 = 25%% 느려지면 회귀)")
+    args = parser.parse_args(argv)
+
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"알 수 없는 단계: {', '.join(unknown)}")
+
+    results = run_suite(args.bars, args.tickers, stages, args.repeat)
+
+    status = 0
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for key, before, after, ratio in regressions:
+            print(f"⚠️ 회귀: {key} {before * 1000:.1f} ms → {after * 1000:.1f} ms (x{ratio:.2f})")
+        if regressions:
+            status = 1
+        else:
+            print("기준 대비 회귀 없음")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({'python': sys.version.split()[0], 'machine': platform.machine(),
+                       'numpy': np.__version__, 'pandas': pd.__version__,
+                       'created': time.strftime('%Y-%m-%d %H:%M:%S'), 'results': results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"기준 저장 → {args.baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+import threading
+from collections import OrderedDict
+from market_data import fetch_many
+from pipeline import analyze, data_version
+from charts import build_stock_chart, DEFAULT_MAX_POINTS
+from instrumentation import timed, record_cache
+
+# 차트 분석 탭 한 페이지에 그리는 종목 수 기본값
+CHARTS_PER_PAGE = 5
+# 만든 차트 캐시 크기 (페이지 이동/재실행/다른 세션에서 재사용)
+FIGURE_CACHE_SIZE = 64
+# 종목별 요약표 줄 캐시 크기 (다른 페이지 종목 요약은 여기 있는 것만 보여 줌)
+SUMMARY_CACHE_SIZE = 4096
+SUMMARY_COLUMNS = ['종목', '통화', '현재가', '등락률(%)', '%K', '%D', 'RSI', '신호']
+
+_figures = OrderedDict()
+_figures_lock = threading.Lock()
+_summaries = OrderedDict()
+_summaries_lock = threading.Lock()
+_prefetching = set()
+_prefetch_lock = threading.Lock()
+
+
+def page_count(n, per_page=CHARTS_PER_PAGE):
+    return max(1, -(-n // per_page))
+
+
+# page: 1부터
+def page_tickers(tickers, page, per_page=CHARTS_PER_PAGE):
+    start = (page - 1) * per_page
+    return tickers[start:start + per_page]
+
+
+# 지표 파라미터: (k_period, d_period, smooth_k, rsi_period, oversold, overbought)
+# 차트 설정: (max_points, webgl)
+def _figure_key(ticker, timeframe, df, params, currency, chart):
+    return (ticker, timeframe, data_version(df), params, currency, chart)
+
+
+# 분석 결과 + 차트 (같은 데이터 버전/설정의 차트는 다시 만들지 않음)
+# 반환된 Figure는 공유 객체이므로 수정하지 말 것
+def prepare(ticker, timeframe, df, params, currency, chart=(DEFAULT_MAX_POINTS, False)):
+    k_period, d_period, smooth_k, rsi_period, oversold, overbought = params
+    analysed = analyze(ticker, timeframe, df, *params)
+    key = _figure_key(ticker, timeframe, df, params, currency, chart)
+    with _figures_lock:
+        fig = _figures.get(key)
+        if fig is not None:
+            _figures.move_to_end(key)
+    record_cache("chart", fig is not None)
+    if fig is None:
+        with timed("chart_build", ticker):
+            fig = build_stock_chart(analysed, oversold, overbought, currency,
+                                    max_points=chart[0], webgl=chart[1])
+        with _figures_lock:
+            _figures[key] = fig
+            while len(_figures) > FIGURE_CACHE_SIZE:
+                _figures.popitem(last=False)
+    return analysed, fig
+
+
+def _prefetch(tickers, timeframe, params, chart, key):
+    try:
+        batch, errors = fetch_many(tickers, timeframe)
+        for ticker in tickers:
+            if ticker in batch:
+                df, name, source, currency = batch[ticker]
+                if chart is None:
+                    df = analyze(ticker, timeframe, df, *params)
+                else:
+                    df, fig = prepare(ticker, timeframe, df, params, currency, chart)
+                remember_summary(ticker, timeframe, params, name, df, currency)
+            else:
+                remember_summary(ticker, timeframe, params, None, None, None)
+    except Exception:
+        pass
+    finally:
+        with _prefetch_lock:
+            _prefetching.discard(key)
+
+
+# 종목들의 봉/지표/차트를 백그라운드에서 미리 준비 (같은 요청이 진행 중이면 무시)
+# chart가 None이면 차트는 만들지 않고 지표/요약표 줄만 준비
+def prefetch(tickers, timeframe, params, chart=(DEFAULT_MAX_POINTS, False)):
+    if not tickers:
+        return False
+    key = (tuple(tickers), timeframe, params, chart)
+    with _prefetch_lock:
+        if key in _prefetching:
+            return False
+        _prefetching.add(key)
+    threading.Thread(target=_prefetch, args=(list(tickers), timeframe, params, chart, key),
+                     daemon=True).start()
+    return True
+
+
+# 요약표 한 줄 (분석 결과 마지막 봉 기준)
+def summary_row(ticker, name, df, currency):
+    curr = df.iloc[-1]
+    prev_close = df['Close'].iloc[-2] if len(df) > 1 else curr['Close']
+    if curr.get('Strong_Buy', False):
+        signal = "적극매수"
+    elif curr['Buy_Signal'] == curr['Buy_Signal']:
+        signal = "매수"
+    elif curr['Sell_Signal'] == curr['Sell_Signal']:
+        signal = "매도"
+    else:
+        signal = ""
+    return {
+        '종목': f"{name} ({ticker})", '통화': currency,
+        '현재가': float(curr['Close']), '등락률(%)': float((curr['Close'] - prev_close) / prev_close * 100),
+        '%K': float(curr['%K']), '%D': float(curr['%D']), 'RSI': float(curr['RSI']), '신호': signal,
+    }
+
+
+# 아직 준비되지 않았거나 불러오지 못한 종목의 요약표 줄
+def placeholder_row(ticker, signal="준비 중"):
+    row = dict.fromkeys(SUMMARY_COLUMNS)
+    row.update({'종목': ticker, '신호': signal})
+    return row
+
+
+# 분석 결과의 요약표 줄을 캐시에 저장 (df가 None이면 불러오기 실패로 기록)
+def remember_summary(ticker, timeframe, params, name, df, currency):
+    if df is None or df.empty:
+        row = placeholder_row(ticker, "불러오기 실패")
+    else:
+        row = summary_row(ticker, name, df, currency)
+    with _summaries_lock:
+        _summaries[(ticker, timeframe, params)] = row
+        _summaries.move_to_end((ticker, timeframe, params))
+        while len(_summaries) > SUMMARY_CACHE_SIZE:
+            _summaries.popitem(last=False)
+
+
+# 캐시된 요약표 줄 (없으면 None, 네트워크 조회 없음)
+def cached_summary(ticker, timeframe, params):
+    with _summaries_lock:
+        return _summaries.get((ticker, timeframe, params))
@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from downsample import bucket_size, downsample_ohlcv, downsample_line
+
+# 차트 최대 포인트 기본값 (화면 가로 픽셀 수준)
+DEFAULT_MAX_POINTS = 1500
+
+
+# 종목 차트 (캔들 + 이평선 + 신호 / 거래량 / 스토캐스틱)
+# max_points: 화면 구간 최대 포인트 수 (None이면 원본 그대로), webgl: 선 지표를 Scattergl로
+def build_stock_chart(df, oversold, overbought, currency, max_points=DEFAULT_MAX_POINTS, webgl=False):
+    end_date = df.index[-1]
+    start_date = end_date - pd.DateOffset(months=5)
+
+    # 화면 구간(최근 5개월) 봉 수가 max_points를 넘으면 버킷 집계
+    size = bucket_size(int((df.index >= start_date).sum()), max_points)
+    bars = downsample_ohlcv(df, size)
+    n_points = len(bars)
+    line = go.Scattergl if webgl else go.Scatter
+
+    fig = make_subplots(rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.02,
+                      row_heights=[0.65, 0.15, 0.2])
+
+    fig.add_trace(go.Candlestick(x=bars.index, open=bars['Open'], high=bars['High'],
+                                low=bars['Low'], close=bars['Close'],
+                                increasing_line_color='red', decreasing_line_color='blue',
+                                name=''), row=1, col=1)
+
+    ma5 = downsample_line(df['MA5'], n_points)
+    fig.add_trace(line(x=ma5.index, y=ma5, line=dict(color='#FF6B35', width=2),
+                       name='MA5'), row=1, col=1)
+    ma20 = downsample_line(df['MA20'], n_points)
+    fig.add_trace(line(x=ma20.index, y=ma20, line=dict(color='#2979FF', width=3),
+                       name='MA20'), row=1, col=1)
+    ma60 = downsample_line(df['MA60'], n_points)
+    fig.add_trace(line(x=ma60.index, y=ma60, line=dict(color='#9D4EDD', width=3),
+                       name='MA60'), row=1, col=1)
+
+    strong_buy = df[df['Strong_Buy'] == True]
+    normal_buy = df[(~df['Buy_Signal'].isna()) & (df['Strong_Buy'] == False)]
+    sell = df[~df['Sell_Signal'].isna()]
+
+    if len(strong_buy) > 0:
+        fig.add_trace(go.Scatter(x=strong_buy.index, y=strong_buy['Buy_Signal'],
+                               mode='markers+text',
+                               marker=dict(symbol='triangle-up', size=25, color='#FF0000',
+                                         line=dict(width=2, color='yellow')),
+                               text=["적극매수"] * len(strong_buy),
+                               textposition="bottom center",
+                               textfont=dict(color='#FF0000', size=14),
+                               name='적극매수'), row=1, col=1)
+
+    if len(normal_buy) > 0:
+        fig.add_trace(go.Scatter(x=normal_buy.index, y=normal_buy['Buy_Signal'],
+                               mode='markers+text',
+                               marker=dict(symbol='triangle-up', size=15, color='#FF6B35'),
+                               text=["매수"] * len(normal_buy),
+                               textposition="bottom center",
+                               textfont=dict(color='#FF6B35', size=11),
+                               name='매수'), row=1, col=1)
+
+    if len(sell) > 0:
+        fig.add_trace(go.Scatter(x=sell.index, y=sell['Sell_Signal'],
+                               mode='markers+text',
+                               marker=dict(symbol='triangle-down', size=18, color='#2979FF'),
+                               text=["매도"] * len(sell),
+                               textposition="top center",
+                               textfont=dict(color='#2979FF', size=13),
+                               name='매도'), row=1, col=1)
+
+    colors = np.where(bars['Open'].to_numpy() <= bars['Close'].to_numpy(), 'red', 'blue')
+    fig.add_trace(go.Bar(x=bars.index, y=bars['Volume'], marker_color=colors,
+                       name='거래량'), row=2, col=1)
+
+    k_line = downsample_line(df['%K'], n_points)
+    fig.add_trace(line(x=k_line.index, y=k_line, line=dict(color='#00E5FF', width=2),
+                       name='%K'), row=3, col=1)
+    d_line = downsample_line(df['%D'], n_points)
+    fig.add_trace(line(x=d_line.index, y=d_line, line=dict(color='#FF6D00', width=2),
+                       name='%D'), row=3, col=1)
+    fig.add_hline(y=oversold, line_dash="dash", line_color="#00E676", line_width=2, row=3, col=1)
+    fig.add_hline(y=overbought, line_dash="dash", line_color="#FF1744", line_width=2, row=3, col=1)
+
+    fig.update_layout(height=700, template="plotly_dark", showlegend=False,
+                    hovermode="closest", dragmode='pan',
+                    margin=dict(l=50, r=80, t=30, b=40),
+                    paper_bgcolor="#000000", plot_bgcolor="#000000",
+                    xaxis_rangeslider_visible=False)
+
+    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128, 128, 128, 0.2)',
+                   range=[start_date, end_date],
+                   tickformat='%Y년 %m월')
+
+    if currency == "KRW":
+        fig.update_yaxes(showgrid=True, gridcolor='rgba(128, 128, 128, 0.2)',
+                       side='right', tickformat=',', ticksuffix='원', row=1, col=1)
+    else:
+        fig.update_yaxes(showgrid=True, gridcolor='rgba(128, 128, 128, 0.2)',
+                       side='right', tickformat=',.2f', tickprefix='$', row=1, col=1)
+
+    fig.update_yaxes(showgrid=True, gridcolor='rgba(128, 128, 128, 0.2)',
+                   side='right', row=2, col=1)
+    fig.update_yaxes(showgrid=True, gridcolor='rgba(128, 128, 128, 0.2)',
+                   side='right', range=[0, 100], row=3, col=1)
+
+    return fig
+
+
+# 실시간 감시용 작은 차트 (최근 봉 캔들 + %K/%D)
+def build_live_chart(rows, oversold, overbought):
+    x = [row['time'] for row in rows]
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.03,
+                      row_heights=[0.65, 0.35])
+    fig.add_trace(go.Candlestick(x=x, open=[row['Open'] for row in rows],
+                                high=[row['High'] for row in rows],
+                                low=[row['Low'] for row in rows],
+                                close=[row['Close'] for row in rows],
+                                increasing_line_color='red', decreasing_line_color='blue',
+                                name=''), row=1, col=1)
+    fig.add_trace(go.Scatter(x=x, y=[row['%K'] for row in rows], line=dict(color='#00E5FF', width=1),
+                           name='%K'), row=2, col=1)
+    fig.add_trace(go.Scatter(x=x, y=[row['%D'] for row in rows], line=dict(color='#FF6D00', width=1),
+                           name='%D'), row=2, col=1)
+    fig.add_hline(y=oversold, line_dash="dash", line_color="#00E676", row=2, col=1)
+    fig.add_hline(y=overbought, line_dash="dash", line_color="#FF1744", row=2, col=1)
+    fig.update_layout(height=300, template="plotly_dark", showlegend=False,
+                    margin=dict(l=10, r=50, t=10, b=10),
+                    paper_bgcolor="#000000", plot_bgcolor="#000000",
+                    xaxis_rangeslider_visible=False)
+    fig.update_yaxes(side='right', gridcolor='rgba(128, 128, 128, 0.2)')
+    fig.update_yaxes(range=[0, 100], row=2, col=1)
+    return fig
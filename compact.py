@@ -0,0 +1,121 @@
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+
+BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
+
+# float32로 줄였을 때 허용하는 가격 오차 (최소 호가 단위 0.01의 절반)
+PRICE_TOLERANCE = 0.005
+
+# DataFrame 캐시 전체 메모리 상한 (MB, 환경변수 STOCK_CACHE_MB)
+# 지표 결과(pipeline), 집계 봉(resample), 읽은 봉 파일(bar_store) 캐시가 이 한도 하나를 나눠 씀
+# (차트 Figure/요약표 캐시는 개수로만 제한: chart_grid.FIGURE_CACHE_SIZE, SUMMARY_CACHE_SIZE)
+CACHE_BYTES = int(os.environ.get("STOCK_CACHE_MB", "256")) * 1024 * 1024
+
+
+def frame_bytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+# 캐시용 봉 데이터: OHLCV만, 가격은 오차가 허용 범위면 float32, 거래량은 int64
+# (시간 인덱스는 이미 int64 epoch ns + 시간대 정보라 그대로 둠)
+def compact_bars(df):
+    if df is None or df.empty:
+        return df
+    out = df[BAR_COLUMNS].copy()
+    prices = out[PRICE_COLUMNS].to_numpy(dtype=np.float64)
+    small = prices.astype(np.float32)
+    with np.errstate(invalid='ignore'):
+        error = np.nanmax(np.abs(small - prices)) if np.isfinite(prices).any() else 0.0
+    if error <= PRICE_TOLERANCE:
+        out[PRICE_COLUMNS] = small
+    out['Volume'] = np.nan_to_num(out['Volume'].to_numpy(dtype=np.float64)).round().astype(np.int64)
+    return out
+
+
+# 지표/신호 컬럼을 float32로 (신호 판정은 float64로 끝난 뒤라 결과는 그대로)
+def compact_analysis(df):
+    columns = [col for col in df.columns
+               if col not in BAR_COLUMNS and df[col].dtype == np.float64]
+    if columns:
+        df[columns] = df[columns].astype(np.float32)
+    if 'Strong_Buy' in df.columns:
+        df['Strong_Buy'] = df['Strong_Buy'].astype(bool)
+    return df
+
+
+# 여러 FrameLRU가 함께 쓰는 바이트 한도 (한도를 넘으면 모든 캐시 중 가장 오래 안 쓴 항목부터 제거)
+class ByteBudget:
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.caches = []
+        self.lock = threading.Lock()
+        self._tick = 0
+
+    def touch(self):
+        self._tick += 1
+        return self._tick
+
+    # 한도 초과분 제거 (keep: 방금 넣은 항목은 제외)
+    def evict(self, keep):
+        while self.nbytes > self.max_bytes:
+            oldest = None
+            for cache in self.caches:
+                for key, (df, size, tick) in cache._items.items():
+                    if (cache, key) != keep and (oldest is None or tick < oldest[2]):
+                        oldest = (cache, key, tick)
+                    break
+            if oldest is None:
+                return
+            oldest[0]._remove(oldest[1])
+
+
+SHARED_BUDGET = ByteBudget()
+
+
+# 개수는 캐시별 상한, 바이트 수는 공유 한도(budget) 이하인 LRU (DataFrame 값)
+class FrameLRU:
+    def __init__(self, max_entries, budget=None):
+        self.max_entries = max_entries
+        self.budget = budget or SHARED_BUDGET
+        self.nbytes = 0
+        self._items = OrderedDict()
+        self._lock = self.budget.lock
+        with self._lock:
+            self.budget.caches.append(self)
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            df, size, tick = self._items.pop(key)
+            self._items[key] = (df, size, self.budget.touch())
+            return df
+
+    def _remove(self, key):
+        size = self._items.pop(key)[1]
+        self.nbytes -= size
+        self.budget.nbytes -= size
+
+    def put(self, key, df):
+        size = frame_bytes(df)
+        with self._lock:
+            if key in self._items:
+                self._remove(key)
+            self._items[key] = (df, size, self.budget.touch())
+            self.nbytes += size
+            self.budget.nbytes += size
+            while len(self._items) > self.max_entries:
+                self._remove(next(iter(self._items)))
+            self.budget.evict((self, key))
+
+    def clear(self):
+        with self._lock:
+            while self._items:
+                self._remove(next(iter(self._items)))
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+
+# 화면에 보이는 봉 수 기준 버킷 크기 (버킷 1개 = 화면 포인트 1개)
+def bucket_size(n_visible, max_points):
+    if not max_points or n_visible <= max_points:
+        return 1
+    return -(-n_visible // max_points)
+
+
+# 연속 봉 size개씩 묶어 OHLCV 집계 (시가=첫 봉, 고가=최고, 저가=최저, 종가=마지막 봉, 거래량=합)
+def downsample_ohlcv(df, size):
+    if size <= 1 or len(df) <= size:
+        return df
+    n = len(df)
+    starts = np.arange(0, n, size)
+    ends = np.minimum(starts + size, n) - 1
+    return pd.DataFrame({
+        'Open': df['Open'].to_numpy()[starts],
+        'High': np.fmax.reduceat(df['High'].to_numpy(dtype=np.float64), starts),
+        'Low': np.fmin.reduceat(df['Low'].to_numpy(dtype=np.float64), starts),
+        'Close': df['Close'].to_numpy()[ends],
+        'Volume': np.add.reduceat(np.nan_to_num(df['Volume'].to_numpy(dtype=np.float64)), starts),
+    }, index=df.index[starts])
+
+
+# Largest-Triangle-Three-Buckets: 선 모양을 유지하는 threshold개 점의 위치 반환
+def lttb(x, y, threshold):
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    edges = np.minimum((np.arange(threshold) * every).astype(np.int64) + 1, n - 1)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < threshold else n
+        if next_end <= next_start:
+            next_end = next_start + 1
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        # 직전 선택점(a)과 다음 버킷 평균점으로 만든 삼각형 면적이 가장 큰 점 선택
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+# 선 지표(Series)를 threshold개 점으로 줄이기 (NaN 구간은 제외)
+def downsample_line(series, threshold):
+    values = series.to_numpy(dtype=np.float64)
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) <= threshold:
+        return series.iloc[valid]
+    # x는 봉 순서 (장 마감 시간 공백이 선 모양을 왜곡하지 않도록)
+    picked = valid[lttb(valid.astype(np.float64), values[valid], threshold)]
+    return series.iloc[picked]
@@ -0,0 +1,158 @@
+import math
+from collections import namedtuple
+import numpy as np
+
+# 지표 커널: NumPy 배열의 마지막 축(시간) 기준, 1차원(종목 1개)·2차원(종목 × 봉) 모두 지원
+# 창 안에 NaN이 있으면 NaN (pandas rolling과 동일)
+Stochastic = namedtuple("Stochastic", ["k", "d"])
+
+def _as_float(values):
+    return np.asarray(values, dtype=np.float64)
+
+# 창 안에 NaN이 있는지 (NaN 개수 누적합 차이)
+def _nan_in_window(nan, window):
+    nan_count = np.cumsum(nan, axis=-1, dtype=np.int64)
+    counts = nan_count[..., window - 1:].copy()
+    counts[..., 1:] -= nan_count[..., :-window]
+    return counts > 0
+
+# 창 [i, i+window-1]마다 func 누적 (van Herk/Gil-Werman, 봉당 O(1))
+# 창 크기 블록별로 뒤쪽 누적(suffix)과 앞쪽 누적(prefix)을 구해 두 값만 합침
+# 합계처럼 중복되면 안 되는 연산은 블록과 창이 정확히 겹칠 때 prefix만 사용
+# 반환: 창 끝 봉(window-1 이후) 위치의 값, 창 안에 NaN이 있으면 NaN
+def _window_reduce(values, window, func, fill, idempotent=True):
+    values = _as_float(values)
+    n = values.shape[-1]
+    nan = np.isnan(values)
+    has_nan = nan.any()
+    rows = values.reshape(-1, n)
+    pad = (-n) % window
+    x = np.empty((len(rows), n + pad))
+    x[:, n:] = fill
+    if has_nan:
+        np.copyto(x[:, :n], np.where(nan.reshape(-1, n), fill, rows))
+    else:
+        x[:, :n] = rows
+    blocks = x.reshape(len(rows), -1, window)
+    prefix = func.accumulate(blocks, axis=2).reshape(len(rows), -1)[:, window - 1:n]
+    suffix = func.accumulate(blocks[:, :, ::-1], axis=2)[:, :, ::-1].reshape(len(rows), -1)[:, :n - window + 1]
+    if idempotent:
+        result = func(suffix, prefix)
+    else:
+        aligned = np.arange(n - window + 1) % window == 0
+        result = np.where(aligned, prefix, func(suffix, prefix))
+    result = result.reshape(values.shape[:-1] + (n - window + 1,))
+    if has_nan:
+        result[_nan_in_window(nan, window)] = np.nan
+    return result
+
+# 단순 이동평균 (창 합계는 최대 2개 블록 누적값의 합이라 긴 누적합처럼 오차가 쌓이지 않음)
+def sma(values, window):
+    values = _as_float(values)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] >= window:
+        out[..., window - 1:] = _window_reduce(values, window, np.add, 0.0, idempotent=False) / window
+    return out
+
+def _rolling_extreme(values, window, func, fill):
+    values = _as_float(values)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] >= window:
+        out[..., window - 1:] = _window_reduce(values, window, func, fill)
+    return out
+
+def rolling_max(values, window):
+    return _rolling_extreme(values, window, np.maximum, -np.inf)
+
+def rolling_min(values, window):
+    return _rolling_extreme(values, window, np.minimum, np.inf)
+
+# %K/%D 반올림 자릿수: 호가 단위 가격에서 자주 나오는 동률(%K == %D, %K == 과매도 기준)이
+# 부동소수점 끝자리 오차로 교차 신호가 되지 않도록
+STOCH_DECIMALS = 10
+
+# 스토캐스틱 → Stochastic(k, d)
+def stochastic(high, low, close, k_period, d_period, smooth_k):
+    low_min = rolling_min(low, k_period)
+    high_max = rolling_max(high, k_period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        raw_k = 100 * ((_as_float(close) - low_min) / (high_max - low_min))
+    k = np.round(sma(raw_k, smooth_k), STOCH_DECIMALS)
+    return Stochastic(k, np.round(sma(k, d_period), STOCH_DECIMALS))
+
+# y[t] = (1 - alpha) * y[t-1] + alpha * x[t], y[-1] = 0
+# 블록 단위 닫힌 식으로 계산 (블록 안은 벡터 연산, 블록 사이만 값 전달)
+def _recursive_mean(x, alpha):
+    if alpha >= 1:
+        return x.copy()
+    decay = 1 - alpha
+    block = max(1, min(1024, int(300 / -math.log(decay))))
+    out = np.empty(x.shape)
+    prev = np.zeros(x.shape[:-1] + (1,))
+    for start in range(0, x.shape[-1], block):
+        chunk = x[..., start:start + block]
+        powers = decay ** np.arange(chunk.shape[-1])
+        y = decay * powers * prev + alpha * powers * np.cumsum(chunk / powers, axis=-1)
+        out[..., start:start + block] = y
+        prev = y[..., -1:]
+    return out
+
+# Wilder 평균: 첫 period개 변화량의 평균에서 시작해 1/period씩 반영
+# first: 행별 첫 유효 봉 위치
+def _wilder_mean(values, period, first):
+    n = values.shape[-1]
+    seed_at = first + period
+    csum = np.cumsum(values, axis=-1)
+    seed_index = np.minimum(seed_at, n - 1)
+    seed = (np.take_along_axis(csum, seed_index, axis=-1)
+            - np.take_along_axis(csum, first, axis=-1)) / period
+
+    index = np.arange(n)
+    x = np.where(index > seed_at, values, 0.0)
+    x = np.where(index == seed_at, seed * period, x)
+    out = _recursive_mean(x, 1 / period)
+    return np.where(index >= seed_at, out, np.nan)
+
+# RSI
+# method="sma": 단순 이동평균 (대시보드 기본, 첫 변화량은 0)
+# method="wilder": Wilder 평활
+def rsi(close, period, method="sma"):
+    close = _as_float(close)
+    delta = np.zeros(close.shape)
+    delta[..., 1:] = np.diff(close, axis=-1)
+    np.nan_to_num(delta, copy=False)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    first = np.argmax(~np.isnan(close), axis=-1)[..., None]
+
+    if method == "wilder":
+        avg_gain = _wilder_mean(gain, period, first)
+        avg_loss = _wilder_mean(loss, period, first)
+    else:
+        avg_gain = sma(gain, period)
+        avg_loss = sma(loss, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = 100 - (100 / (1 + avg_gain / avg_loss))
+    # 앞쪽 NaN 구간(상장 전, 짧은 종목 패딩)은 기간을 채울 때까지 제외
+    out[np.arange(close.shape[-1]) - first + 1 < period] = np.nan
+    return out
+
+# 이동평균선
+def add_moving_averages(df, windows=(5, 20, 60)):
+    close = df['Close'].to_numpy(dtype=np.float64)
+    for window in windows:
+        df[f'MA{window}'] = sma(close, window)
+    return df
+
+# 스토캐스틱 계산
+def calculate_stochastic(df, k_period, d_period, smooth_k):
+    result = stochastic(df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy(),
+                        k_period, d_period, smooth_k)
+    df['%K'] = result.k
+    df['%D'] = result.d
+    return df
+
+# RSI 계산
+def calculate_rsi(df, period):
+    df['RSI'] = rsi(df['Close'].to_numpy(), period)
+    return df
@@ -0,0 +1,111 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# 프로세스 전체 계측값 (단계별/종목별 소요 시간, 캐시 적중, 받은 데이터 크기)
+_lock = threading.Lock()
+_stages = {}
+_ticker_stages = {}
+_caches = {}
+_bytes = {}
+_started = time.time()
+
+
+def _add_timing(table, key, seconds):
+    stat = table.get(key)
+    if stat is None:
+        table[key] = {'count': 1, 'total': seconds, 'max': seconds, 'last': seconds}
+    else:
+        stat['count'] += 1
+        stat['total'] += seconds
+        stat['max'] = max(stat['max'], seconds)
+        stat['last'] = seconds
+
+
+def record_timing(stage, seconds, ticker=None):
+    with _lock:
+        _add_timing(_stages, stage, seconds)
+        if ticker is not None:
+            _add_timing(_ticker_stages, (ticker, stage), seconds)
+
+
+# with timed("indicators", ticker): ... 블록 소요 시간 기록
+@contextmanager
+def timed(stage, ticker=None):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(stage, time.perf_counter() - start, ticker)
+
+
+def record_cache(cache, hit):
+    with _lock:
+        stat = _caches.setdefault(cache, {'hit': 0, 'miss': 0})
+        stat['hit' if hit else 'miss'] += 1
+
+
+def record_bytes(ticker, nbytes):
+    with _lock:
+        _bytes[ticker] = _bytes.get(ticker, 0) + int(nbytes)
+
+
+def reset():
+    global _started
+    with _lock:
+        _stages.clear()
+        _ticker_stages.clear()
+        _caches.clear()
+        _bytes.clear()
+        _started = time.time()
+
+
+def snapshot():
+    with _lock:
+        tickers = {}
+        for (ticker, stage), stat in _ticker_stages.items():
+            tickers.setdefault(ticker, {})[stage] = dict(stat)
+        return {
+            'since': _started,
+            'stages': {stage: dict(stat) for stage, stat in _stages.items()},
+            'caches': {cache: dict(stat) for cache, stat in _caches.items()},
+            'tickers': tickers,
+            'bytes_fetched': dict(_bytes),
+        }
+
+
+def export_json():
+    return json.dumps(snapshot(), ensure_ascii=False, indent=2)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Prometheus 텍스트 형식 (종목별 시간은 라벨 수가 많아 JSON에만 포함)
+def export_prometheus():
+    data = snapshot()
+    lines = [
+        "# HELP stock_stage_seconds_total 단계별 누적 소요 시간",
+        "# TYPE stock_stage_seconds_total counter",
+    ]
+    lines += [f'stock_stage_seconds_total{{stage="{_label(stage)}"}} {stat["total"]:.6f}'
+              for stage, stat in data['stages'].items()]
+    lines += ["# HELP stock_stage_calls_total 단계별 실행 횟수",
+              "# TYPE stock_stage_calls_total counter"]
+    lines += [f'stock_stage_calls_total{{stage="{_label(stage)}"}} {stat["count"]}'
+              for stage, stat in data['stages'].items()]
+    lines += ["# HELP stock_stage_seconds_max 단계별 최대 소요 시간",
+              "# TYPE stock_stage_seconds_max gauge"]
+    lines += [f'stock_stage_seconds_max{{stage="{_label(stage)}"}} {stat["max"]:.6f}'
+              for stage, stat in data['stages'].items()]
+    lines += ["# HELP stock_cache_requests_total 캐시 조회 결과",
+              "# TYPE stock_cache_requests_total counter"]
+    for cache, stat in data['caches'].items():
+        for result in ('hit', 'miss'):
+            lines.append(f'stock_cache_requests_total{{cache="{_label(cache)}",result="{result}"}} {stat[result]}')
+    lines += ["# HELP stock_bytes_fetched_total 원격에서 받은 봉 데이터 크기",
+              "# TYPE stock_bytes_fetched_total counter",
+              f"stock_bytes_fetched_total {sum(data['bytes_fetched'].values())}"]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,181 @@
+import copy
+import math
+from collections import deque
+import numpy as np
+from indicators import STOCH_DECIMALS
+
+# 실시간 화면에 유지하는 최근 봉 수
+DISPLAY_BARS = 120
+
+
+# 이동평균 (누적합 유지, 창 안에 NaN이 있으면 NaN: pandas rolling과 동일)
+class RollingMean:
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+        self.nans = 0
+
+    def push(self, value):
+        self.values.append(value)
+        if math.isnan(value):
+            self.nans += 1
+        else:
+            self.total += value
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if math.isnan(old):
+                self.nans -= 1
+            else:
+                self.total -= old
+        if len(self.values) < self.window or self.nans:
+            return math.nan
+        return self.total / self.window
+
+
+# 이동 최솟값/최댓값 (단조 덱: 봉당 평균 O(1))
+class RollingExtreme:
+    def __init__(self, window, is_max):
+        self.window = window
+        self.is_max = is_max
+        self.candidates = deque()
+        self.nan_positions = deque()
+        self.count = 0
+
+    def push(self, value):
+        position = self.count
+        self.count += 1
+        while self.candidates and self.candidates[0][0] <= position - self.window:
+            self.candidates.popleft()
+        while self.nan_positions and self.nan_positions[0] <= position - self.window:
+            self.nan_positions.popleft()
+
+        if math.isnan(value):
+            self.nan_positions.append(position)
+        else:
+            while self.candidates and (self.candidates[-1][1] <= value if self.is_max
+                                       else self.candidates[-1][1] >= value):
+                self.candidates.pop()
+            self.candidates.append((position, value))
+
+        if self.count < self.window or self.nan_positions:
+            return math.nan
+        return self.candidates[0][1]
+
+
+def _divide(a, b):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return float(np.float64(a) / np.float64(b))
+
+
+# 이동평균/스토캐스틱/RSI 증분 계산 (calculate_stochastic, calculate_rsi와 같은 식)
+class IncrementalIndicators:
+    def __init__(self, k_period, d_period, smooth_k, rsi_period, ma_windows=(5, 20, 60)):
+        self.ma = {window: RollingMean(window) for window in ma_windows}
+        self.low_min = RollingExtreme(k_period, is_max=False)
+        self.high_max = RollingExtreme(k_period, is_max=True)
+        self.k_mean = RollingMean(smooth_k)
+        self.d_mean = RollingMean(d_period)
+        self.gain_mean = RollingMean(rsi_period)
+        self.loss_mean = RollingMean(rsi_period)
+        self.prev_close = None
+        self.prev_k = math.nan
+        self.prev_d = math.nan
+        self.last = None
+
+    # 지표가 모두 채워지려면 필요한 봉 수 (이보다 오래된 봉은 현재 값에 영향 없음)
+    @staticmethod
+    def warmup_bars(k_period, d_period, smooth_k, rsi_period, ma_windows=(5, 20, 60)):
+        return max(max(ma_windows), k_period + smooth_k + d_period, rsi_period + 1) + 1
+
+    def push(self, high, low, close):
+        row = {f'MA{window}': mean.push(close) for window, mean in self.ma.items()}
+
+        low_min = self.low_min.push(low)
+        high_max = self.high_max.push(high)
+        raw_k = 100 * _divide(close - low_min, high_max - low_min)
+        k = round(self.k_mean.push(raw_k), STOCH_DECIMALS)
+        d = round(self.d_mean.push(k), STOCH_DECIMALS)
+
+        delta = 0.0 if self.prev_close is None else close - self.prev_close
+        gain = self.gain_mean.push(delta if delta > 0 else 0.0)
+        loss = self.loss_mean.push(-delta if delta < 0 else 0.0)
+        rsi = 100 - _divide(100, 1 + _divide(gain, loss))
+
+        row.update({'%K': k, '%D': d, 'RSI': rsi, 'prev_%K': self.prev_k, 'prev_%D': self.prev_d})
+        self.prev_close = close
+        self.prev_k = k
+        self.prev_d = d
+        self.last = row
+        return row
+
+    # 진행 중인 봉으로 계산한 값 (상태는 바꾸지 않음, 창 크기만큼만 복사)
+    def peek(self, high, low, close):
+        return copy.deepcopy(self).push(high, low, close)
+
+
+# 직전/현재 %K·%D로 신호 판정 (signals.crossover_masks와 같은 규칙)
+def evaluate_signal(row, oversold, overbought):
+    prev_k, prev_d, k, d = row['prev_%K'], row['prev_%D'], row['%K'], row['%D']
+    if prev_k < prev_d and k > d and k <= oversold:
+        return "적극매수" if d <= oversold else "매수"
+    if prev_k > prev_d and k < d and k >= overbought:
+        return "매도"
+    return None
+
+
+# 종목 1개 실시간 상태: 확정된 봉만 지표 상태에 반영, 마지막(진행 중) 봉은 peek
+class TickerWatch:
+    def __init__(self, df, k_period, d_period, smooth_k, rsi_period, oversold, overbought):
+        self.oversold = oversold
+        self.overbought = overbought
+        self.indicators = IncrementalIndicators(k_period, d_period, smooth_k, rsi_period)
+        self.tail = deque(maxlen=DISPLAY_BARS)
+        self.last_closed = None
+        self.forming = None
+        self.version = 0
+
+        warmup = IncrementalIndicators.warmup_bars(k_period, d_period, smooth_k, rsi_period)
+        closed = df.iloc[:-1]
+        self._push_closed(closed.iloc[-max(warmup, DISPLAY_BARS):])
+        self._set_forming(df.iloc[-1])
+
+    def _push_closed(self, bars):
+        events = []
+        for ts, bar in zip(bars.index, bars.itertuples(index=False)):
+            row = self.indicators.push(bar.High, bar.Low, bar.Close)
+            row.update(time=ts, Open=bar.Open, High=bar.High, Low=bar.Low, Close=bar.Close,
+                       Volume=bar.Volume)
+            row['signal'] = evaluate_signal(row, self.oversold, self.overbought)
+            self.tail.append(row)
+            self.last_closed = ts
+            if row['signal']:
+                events.append(row)
+        return events
+
+    def _set_forming(self, bar):
+        row = self.indicators.peek(bar['High'], bar['Low'], bar['Close'])
+        row.update(time=bar.name, Open=bar['Open'], High=bar['High'], Low=bar['Low'],
+                   Close=bar['Close'], Volume=bar['Volume'])
+        row['signal'] = evaluate_signal(row, self.oversold, self.overbought)
+        self.forming = row
+
+    # 새로 받은 봉(since 이후) 반영 → (입력이 바뀌었는지, 확정 봉에서 새로 생긴 신호 목록)
+    def update(self, new_bars):
+        if new_bars is None or new_bars.empty:
+            return False, []
+        new_bars = new_bars[new_bars.index > self.last_closed]
+        if new_bars.empty:
+            return False, []
+
+        before = (self.forming['time'], self.forming['Close'], self.forming['Volume'])
+        events = self._push_closed(new_bars.iloc[:-1])
+        self._set_forming(new_bars.iloc[-1])
+        changed = bool(events) or before != (self.forming['time'], self.forming['Close'],
+                                             self.forming['Volume'])
+        if changed:
+            self.version += 1
+        return changed, events
+
+    def rows(self):
+        return list(self.tail) + [self.forming]
@@ -1,10 +1,9 @@
 import streamlit as st
-import yfinance as yf
-import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from datetime import datetime, timedelta
-import numpy as np
+import warmup
+
+# 로그인 화면이 떠 있는 동안 무거운 모듈 import + 기본 관심종목/저장된 시트 봉 데이터 준비
+# (프로세스당 한 번, 나머지 import는 로그인 후)
+warmup.start_background()
 
 # 비밀번호 설정
 CORRECT_PASSWORD = "1248"
@@ -43,6 +42,27 @@ def check_password():
 if not check_password():
     st.stop()
 
+import uuid
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from datetime import datetime
+from market_data import fetch_many, fetch_latest_many
+from pipeline import analyze
+from backtest import run_backtest
+from optimizer import optimize_many
+from walkforward import walk_forward_many, combined_equity
+import montecarlo
+from screener import screen
+from portfolio import simulate_portfolio
+from charts import build_live_chart, DEFAULT_MAX_POINTS
+import chart_grid
+from live import TickerWatch
+import alerts
+from watchlist import load_watchlist, select, parse_tickers
+import instrumentation
+from instrumentation import timed
+
 # 페이지 설정
 st.set_page_config(layout="wide", page_title="AI 트레이딩 시스템 Pro", page_icon="🤖")
 
@@ -67,169 +87,81 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# 구글 시트에서 종목 불러오기
-@st.cache_data(ttl=600)
+# 구글 시트에서 종목 불러오기 (디스크 캐시 + 조건부 갱신은 watchlist에서 처리)
 def load_stocks_from_google_sheet(sheet_url):
     try:
-        # URL에서 스프레드시트 ID 추출
-        if '/d/' in sheet_url:
-            # https://docs.google.com/spreadsheets/d/[ID]/edit...
-            sheet_id = sheet_url.split('/d/')[1].split('/')[0]
-            csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv"
-        else:
-            csv_url = sheet_url
-        
-        df = pd.read_csv(csv_url)
-        return df
+        return load_watchlist(sheet_url)
     except Exception as e:
         st.error(f"❌ 구글 시트 로딩 실패: {str(e)}")
         return None
 
-# 한국 주식 데이터
-@st.cache_data(ttl=300)
-def get_data(ticker, timeframe="1d"):
-    try:
-        clean_ticker = ticker.strip().upper()
-        
-        # 봉별 기간 설정
-        timeframe_config = {
-            "1m": {"period": "7d", "interval": "1m"},
-            "5m": {"period": "60d", "interval": "5m"},
-            "15m": {"period": "60d", "interval": "15m"},
-            "30m": {"period": "60d", "interval": "30m"},
-            "60m": {"period": "730d", "interval": "60m"},
-            "1h": {"period": "730d", "interval": "1h"},
-            "1d": {"period": "2y", "interval": "1d"},
-            "1wk": {"period": "10y", "interval": "1wk"},
-            "1mo": {"period": "20y", "interval": "1mo"}
-        }
-        
-        config = timeframe_config.get(timeframe, {"period": "2y", "interval": "1d"})
-        
-        if clean_ticker.isdigit() and len(clean_ticker) == 6:
-            ticker_symbol = clean_ticker + ".KS"
-            stock = yf.Ticker(ticker_symbol)
-            df = stock.history(period=config["period"], interval=config["interval"])
-            
-            if df.empty:
-                ticker_symbol = clean_ticker + ".KQ"
-                stock = yf.Ticker(ticker_symbol)
-                df = stock.history(period=config["period"], interval=config["interval"])
-            
-            source = "야후 파이낸스 (KRX)"
-            currency = "KRW"
-            
-            korean_names = {
-                '005930': '삼성전자', '000660': 'SK하이닉스', '035720': '카카오',
-                '035420': 'NAVER', '005380': '현대차', '000270': '기아',
-                '051910': 'LG화학', '006400': '삼성SDI', '207940': '삼성바이오로직스',
-                '068270': '셀트리온', '028260': '삼성물산', '042700': '한미반도체',
-                '009150': '삼성전기', '012330': '현대모비스', '003550': 'LG',
-                '017670': 'SK텔레콤', '033780': 'KT&G', '018260': '삼성에스디에스',
-                '096770': 'SK이노베이션', '373220': 'LG에너지솔루션', '352820': '하이브',
-                '247540': '에코프로비엠', '086520': '에코프로', '066970': '엘앤에프',
-                '161390': '한국타이어', '326030': 'SK바이오팜', '091990': '셀트리온헬스케어',
-                '055550': '신한지주', '086790': '하나금융지주', '105560': 'KB금융',
-                '316140': '우리금융지주'
-            }
-            
-            name = korean_names.get(clean_ticker, clean_ticker)
-        else:
-            stock = yf.Ticker(clean_ticker)
-            df = stock.history(period=config["period"], interval=config["interval"])
-            source = "야후 파이낸스 (US)"
-            currency = "USD"
-            try:
-                info = stock.info
-                name = info.get('longName', info.get('shortName', clean_ticker))
-            except:
-                name = clean_ticker
-        
-        if df.empty:
-            return None, None, None, None
-        
-        return df, name, source, currency
-    except:
-        return None, None, None, None
-
-# 스토캐스틱 계산
-def calculate_stochastic(df, k_period, d_period, smooth_k):
-    low_min = df['Low'].rolling(window=k_period).min()
-    high_max = df['High'].rolling(window=k_period).max()
-    k = 100 * ((df['Close'] - low_min) / (high_max - low_min))
-    df['%K'] = k.rolling(window=smooth_k).mean()
-    df['%D'] = df['%K'].rolling(window=d_period).mean()
-    return df
-
-# RSI 계산
-def calculate_rsi(df, period):
-    delta = df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    df['RSI'] = 100 - (100 / (1 + rs))
-    return df
+# 여러 종목 일괄 조회 (동시 요청, 종목별 에러 리포트)
+# 봉별 갱신 주기, 세션 간 공유, 중복 요청 합치기는 market_data에서 프로세스 전체로 처리
+def load_batch(tickers, timeframe="1d"):
+    return fetch_many(list(tickers), timeframe)
 
-# 백테스팅
-def run_backtest(df, signal_df):
-    initial_capital = 10000000
-    capital = initial_capital
-    position = 0
-    trades = []
-    equity_curve = []
-    
-    for i in range(len(signal_df)):
-        if not pd.isna(signal_df['Buy_Signal'].iloc[i]) and position == 0:
-            shares = capital // signal_df['Close'].iloc[i]
-            if shares > 0:
-                position = shares
-                buy_price = signal_df['Close'].iloc[i]
-                capital -= shares * buy_price
-                trades.append({'type': 'buy', 'date': signal_df.index[i], 'price': buy_price})
-        elif not pd.isna(signal_df['Sell_Signal'].iloc[i]) and position > 0:
-            sell_price = signal_df['Close'].iloc[i]
-            capital += position * sell_price
-            profit = (sell_price - buy_price) / buy_price * 100
-            trades.append({'type': 'sell', 'date': signal_df.index[i], 'price': sell_price, 'profit': profit})
-            position = 0
-        
-        current_value = capital + (position * signal_df['Close'].iloc[i] if position > 0 else 0)
-        equity_curve.append(current_value)
-    
-    if position > 0:
-        capital += position * signal_df['Close'].iloc[-1]
+# 실시간 감시 패널 (새 봉만 조회해 지표를 증분 갱신, 바뀐 종목만 차트 재생성)
+def render_live_panel(tickers, timeframe, k_period, d_period, smooth_k, rsi_period, oversold, overbought):
+    key = (tuple(tickers), timeframe, k_period, d_period, smooth_k, rsi_period, oversold, overbought)
+    if st.session_state.get("live_key") != key:
+        batch, errors = load_batch(tickers, timeframe)
+        st.session_state.live_watch = {
+            ticker: TickerWatch(batch[ticker][0], k_period, d_period, smooth_k, rsi_period,
+                                oversold, overbought)
+            for ticker in tickers if ticker in batch and len(batch[ticker][0]) > 1
+        }
+        st.session_state.live_names = {ticker: batch[ticker][1] for ticker in tickers if ticker in batch}
+        st.session_state.live_events = []
+        st.session_state.live_figs = {}
+        st.session_state.live_key = key
+    else:
+        watches = st.session_state.live_watch
+        latest, errors = fetch_latest_many({ticker: watch.last_closed for ticker, watch in watches.items()},
+                                           timeframe)
+        for ticker, new_bars in latest.items():
+            changed, events = watches[ticker].update(new_bars)
+            for row in events:
+                st.session_state.live_events.insert(0, {
+                    '시각': row['time'], '종목': f"{st.session_state.live_names[ticker]} ({ticker})",
+                    '신호': row['signal'], '종가': row['Close'], '%K': row['%K'], '%D': row['%D']
+                })
+        del st.session_state.live_events[200:]
     
-    total_return = ((capital - initial_capital) / initial_capital) * 100
-    sell_trades = [t for t in trades if t['type'] == 'sell']
+    watches = st.session_state.live_watch
+    names = st.session_state.live_names
+    st.caption(f"🔴 실시간 감시 중 · {datetime.now():%H:%M:%S} 갱신")
+    st.dataframe(pd.DataFrame([{
+        '종목': f"{names[ticker]} ({ticker})", '시각': watch.forming['time'],
+        '현재가': watch.forming['Close'], '%K': watch.forming['%K'], '%D': watch.forming['%D'],
+        'RSI': watch.forming['RSI'], '신호': watch.forming['signal'] or ''
+    } for ticker, watch in watches.items()]), use_container_width=True, hide_index=True)
     
-    if sell_trades:
-        winning_trades = [t for t in sell_trades if t['profit'] > 0]
-        win_rate = len(winning_trades) / len(sell_trades) * 100
-        avg_win = np.mean([t['profit'] for t in winning_trades]) if winning_trades else 0
-        losing_trades = [t for t in sell_trades if t['profit'] <= 0]
-        avg_loss = abs(np.mean([t['profit'] for t in losing_trades])) if losing_trades else 1
-        profit_loss_ratio = avg_win / avg_loss if avg_loss > 0 else 0
-        
-        max_dd = 0
-        peak = equity_curve[0]
-        for value in equity_curve:
-            if value > peak:
-                peak = value
-            dd = ((peak - value) / peak) * 100
-            if dd > max_dd:
-                max_dd = dd
-    else:
-        win_rate = 0
-        profit_loss_ratio = 0
-        max_dd = 0
+    if st.session_state.live_events:
+        st.markdown("##### 🔔 새 신호")
+        st.dataframe(pd.DataFrame(st.session_state.live_events), use_container_width=True, hide_index=True)
     
-    return {
-        'total_return': total_return,
-        'win_rate': win_rate,
-        'profit_loss_ratio': profit_loss_ratio,
-        'max_drawdown': max_dd,
-        'total_trades': len(sell_trades)
-    }
+    figs = st.session_state.live_figs
+    cols = st.columns(2)
+    for i, (ticker, watch) in enumerate(watches.items()):
+        if ticker not in figs or figs[ticker][0] != watch.version:
+            figs[ticker] = (watch.version, build_live_chart(watch.rows(), oversold, overbought))
+        with cols[i % 2]:
+            st.caption(f"{names[ticker]} ({ticker})")
+            st.plotly_chart(figs[ticker][1], use_container_width=True, key=f"live_{ticker}")
+
+# 백그라운드 알림 피드 (엔진은 세션과 별개로 동작, 화면은 최근 알림만 표시)
+def render_alert_feed(engine):
+    last = datetime.fromtimestamp(engine.last_cycle).strftime('%H:%M:%S') if engine.last_cycle else "-"
+    st.caption(f"🔔 백그라운드 알림 · {len(engine.watches)}/{len(engine.tickers)}개 종목 · "
+               f"마지막 평가 {last} · CPU {engine.cycle_cpu * 1000:.0f}ms")
+    feed = alerts.feed(engine)
+    if feed:
+        st.dataframe(pd.DataFrame([{
+            '시각': event['time'], '종목': f"{event['name']} ({event['ticker']})", '신호': event['signal'],
+            '종가': event['close'], '%K': event['%K'], '%D': event['%D'], 'RSI': event['RSI']
+        } for event in feed]), use_container_width=True, hide_index=True)
+    if engine.sink_errors:
+        st.warning("알림 전송 실패: " + ", ".join(f"{sink}: {error}" for sink, error in engine.sink_errors.items()))
 
 # 헤더
 st.markdown("""
@@ -268,7 +200,7 @@ with st.sidebar:
                                     value=st.session_state.saved_tickers, 
                                     height=100,
                                     key="direct_input")
-        selected_tickers = tickers_input
+        selected_tickers = parse_tickers(tickers_input)
     
     else:  # 구글 시트
         st.markdown("#### 📊 구글 시트")
@@ -285,33 +217,31 @@ with st.sidebar:
             st.session_state.sheet_url = sheet_url
             
             with st.spinner("📥 로딩 중..."):
-                df_stocks = load_stocks_from_google_sheet(sheet_url)
+                watchlist = load_stocks_from_google_sheet(sheet_url)
             
-            if df_stocks is not None:
-                st.success(f"✅ {len(df_stocks)}개 종목")
+            if watchlist is not None:
+                warmup.remember_sheet(sheet_url)
+                st.success(f"✅ {len(watchlist.tickers)}개 종목")
                 
-                if '테마' in df_stocks.columns:
-                    themes = df_stocks['테마'].unique().tolist()
+                if watchlist.themes:
+                    themes = list(watchlist.themes)
                     selected_themes = st.multiselect("테마 선택", 
                                                      themes,
                                                      default=themes[:2] if len(themes) >= 2 else themes)
                     
                     if selected_themes:
-                        filtered_df = df_stocks[df_stocks['테마'].isin(selected_themes)]
-                        tickers_list = filtered_df['종목코드'].astype(str).tolist()
-                        selected_tickers = ', '.join(tickers_list)
+                        selected_tickers = select(watchlist, selected_themes)
                         
-                        st.caption(f"📌 {len(tickers_list)}개 선택됨")
+                        st.caption(f"📌 {len(selected_tickers)}개 선택됨")
                     else:
-                        selected_tickers = ""
+                        selected_tickers = []
                         st.warning("테마를 선택하세요")
                 else:
-                    tickers_list = df_stocks['종목코드'].astype(str).tolist()
-                    selected_tickers = ', '.join(tickers_list)
+                    selected_tickers = select(watchlist)
             else:
-                selected_tickers = ""
+                selected_tickers = []
         else:
-            selected_tickers = ""
+            selected_tickers = []
             st.info("💡 URL 입력")
     
     st.markdown("---")
@@ -336,6 +266,17 @@ with st.sidebar:
         index=6  # 기본값: 일봉
     )
     timeframe = timeframe_options[selected_timeframe_kr]
+    col1, col2 = st.columns(2)
+    with col1:
+        chart_max_points = st.number_input("차트 최대 포인트", value=DEFAULT_MAX_POINTS,
+                                           min_value=200, max_value=20000, step=100,
+                                           help="화면 구간 봉 수가 이보다 많으면 묶어서 표시")
+    with col2:
+        chart_webgl = st.checkbox("WebGL 렌더링", value=timeframe in ("1m", "5m", "15m", "30m"),
+                                  help="분봉 차트 선 지표를 WebGL로 그리기")
+    charts_per_page = st.number_input("페이지당 차트", value=chart_grid.CHARTS_PER_PAGE,
+                                      min_value=1, max_value=20,
+                                      help="현재 페이지 종목만 차트를 그리고 나머지는 요약표로 표시")
     
     st.markdown("---")
     st.subheader("📊 지표 설정")
@@ -349,48 +290,96 @@ with st.sidebar:
     smooth_k = st.number_input("Smooth %K", value=5, min_value=1, max_value=20)
     rsi_period = st.number_input("RSI 기간", value=14, min_value=5, max_value=30)
     
+    st.markdown("---")
+    st.subheader("💰 백테스트 설정")
+    col1, col2 = st.columns(2)
+    with col1:
+        commission = st.number_input("수수료 (%)", value=0.0, min_value=0.0, max_value=1.0,
+                                     step=0.005, format="%.3f") / 100
+    with col2:
+        slippage = st.number_input("슬리피지 (%)", value=0.0, min_value=0.0, max_value=2.0,
+                                   step=0.05, format="%.2f") / 100
+    
     st.markdown("---")
     analyze_btn = st.button("🚀 분석 시작", type="primary", use_container_width=True)
     
     if analyze_btn and input_mode == "직접 입력":
         st.session_state.saved_tickers = tickers_input
+    
+    st.markdown("---")
+    live_mode = st.toggle("🔴 실시간 감시", value=False, help="새 봉만 주기적으로 받아 지표를 갱신")
+    live_interval = st.number_input("갱신 주기 (초)", value=60, min_value=10, max_value=600, step=10)
+    
+    st.markdown("---")
+    alert_mode = st.toggle("🔔 백그라운드 알림", value=False,
+                           help="화면을 닫아도 관심종목 전체를 새 봉마다 평가해 새 신호를 알림")
+    webhook_url = st.text_input("웹훅 URL (선택)", value="", placeholder="https://...").strip() or None
+    
+    # 같은 설정(갱신 주기 포함)의 엔진은 세션 간 공유, 설정이 바뀌거나 끄면 이 세션의 구독만 해제
+    # (다른 세션이 아직 쓰는 엔진은 계속 실행, 마지막 구독자가 해제할 때 멈춤)
+    alert_params = {'k_period': k_period, 'd_period': d_period, 'smooth_k': smooth_k,
+                    'rsi_period': rsi_period, 'oversold': oversold, 'overbought': overbought}
+    alert_owner = st.session_state.setdefault("alert_owner", uuid.uuid4().hex)
+    alert_engine = None
+    if alert_mode and selected_tickers:
+        alert_key = alerts.engine_key(selected_tickers, timeframe, alert_params, webhook_url,
+                                      alerts.default_log_path(), live_interval)
+        if st.session_state.get("alert_key") not in (None, alert_key):
+            alerts.release_engine(st.session_state.alert_key, alert_owner)
+        alert_key, alert_engine = alerts.ensure_engine(alert_owner, selected_tickers, timeframe, alert_params,
+                                                       webhook_url, alerts.default_log_path(), live_interval)
+        st.session_state.alert_key = alert_key
+    elif st.session_state.get("alert_key") is not None:
+        alerts.release_engine(st.session_state.alert_key, alert_owner)
+        st.session_state.alert_key = None
 
 # TAB 1: 차트 분석
 with tab1:
+    if alert_engine is not None:
+        st.fragment(run_every=30)(render_alert_feed)(alert_engine)
+    if live_mode:
+        live_tickers = selected_tickers
+        st.fragment(run_every=live_interval)(render_live_panel)(
+            live_tickers, timeframe, k_period, d_period, smooth_k, rsi_period, oversold, overbought)
+        st.markdown("---")
+    
+    # 분석 시작 시 종목 목록을 기억해 페이지를 넘겨도 유지 (현재 페이지 종목만 차트 생성)
     if analyze_btn:
-        tickers = [t.strip() for t in selected_tickers.split(',') if t.strip()]
+        st.session_state.chart_tickers = list(selected_tickers)
+        st.session_state.chart_page = 1
+    chart_tickers = st.session_state.get("chart_tickers") or []
+    
+    if chart_tickers:
+        chart_params = (k_period, d_period, smooth_k, rsi_period, oversold, overbought)
+        chart_settings = (chart_max_points, chart_webgl)
+        pages = chart_grid.page_count(len(chart_tickers), charts_per_page)
+        if st.session_state.get("chart_page", 1) > pages:
+            st.session_state.chart_page = 1
+        if pages > 1:
+            col1, col2 = st.columns([1, 3])
+            with col1:
+                page = st.selectbox("페이지", list(range(1, pages + 1)), key="chart_page",
+                                    format_func=lambda p: f"{p} / {pages}")
+            with col2:
+                st.caption(f"전체 {len(chart_tickers)}개 종목 · 페이지당 {charts_per_page}개")
+        else:
+            page = 1
+        tickers = chart_grid.page_tickers(chart_tickers, page, charts_per_page)
+        
+        with st.spinner(f"📥 {len(tickers)}개 종목 불러오는 중..."):
+            batch, errors = load_batch(tickers, timeframe)
+        # 보는 동안 다음 페이지 준비
+        chart_grid.prefetch(chart_grid.page_tickers(chart_tickers, page + 1, charts_per_page),
+                            timeframe, chart_params, chart_settings)
         
         for ticker in tickers:
-            df, name, source, currency = get_data(ticker, timeframe)
-            
-            if df is None or df.empty:
-                st.error(f"❌ {ticker}: 데이터 없음")
+            if ticker not in batch:
+                st.error(f"❌ {ticker}: {errors.get(ticker, '데이터 없음')}")
                 continue
-            
-            df['MA5'] = df['Close'].rolling(window=5).mean()
-            df['MA20'] = df['Close'].rolling(window=20).mean()
-            df['MA60'] = df['Close'].rolling(window=60).mean()
-            df = calculate_stochastic(df, k_period, d_period, smooth_k)
-            df = calculate_rsi(df, rsi_period)
-            
-            df['Buy_Signal'] = None
-            df['Sell_Signal'] = None
-            df['Strong_Buy'] = False
-            
-            for i in range(1, len(df)):
-                if (df['%K'].iloc[i-1] < df['%D'].iloc[i-1] and 
-                    df['%K'].iloc[i] > df['%D'].iloc[i] and 
-                    df['%K'].iloc[i] <= oversold and df['%D'].iloc[i] <= oversold):
-                    df.at[df.index[i], 'Buy_Signal'] = df['Low'].iloc[i] * 0.97
-                    df.at[df.index[i], 'Strong_Buy'] = True
-                elif (df['%K'].iloc[i-1] < df['%D'].iloc[i-1] and 
-                      df['%K'].iloc[i] > df['%D'].iloc[i] and 
-                      df['%K'].iloc[i] <= oversold):
-                    df.at[df.index[i], 'Buy_Signal'] = df['Low'].iloc[i] * 0.97
-                elif (df['%K'].iloc[i-1] > df['%D'].iloc[i-1] and 
-                      df['%K'].iloc[i] < df['%D'].iloc[i] and 
-                      df['%K'].iloc[i] >= overbought):
-                    df.at[df.index[i], 'Sell_Signal'] = df['High'].iloc[i] * 1.03
+            df, name, source, currency = batch[ticker]
+            with timed("chart", ticker):
+                df, fig = chart_grid.prepare(ticker, timeframe, df, chart_params, currency, chart_settings)
+            chart_grid.remember_summary(ticker, timeframe, chart_params, name, df, currency)
             
             curr = df.iloc[-1]
             is_strong_buy = curr.get('Strong_Buy', False)
@@ -440,121 +429,44 @@ with tab1:
                 </div>
                 """, unsafe_allow_html=True)
             
-            end_date = df.index[-1]
-            start_date = end_date - pd.DateOffset(months=5)
-            
-            fig = make_subplots(rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.02,
-                              row_heights=[0.65, 0.15, 0.2])
-            
-            fig.add_trace(go.Candlestick(x=df.index, open=df['Open'], high=df['High'],
-                                        low=df['Low'], close=df['Close'],
-                                        increasing_line_color='red', decreasing_line_color='blue',
-                                        name=''), row=1, col=1)
-            
-            fig.add_trace(go.Scatter(x=df.index, y=df['MA5'], line=dict(color='#FF6B35', width=2),
-                                   name='MA5'), row=1, col=1)
-            fig.add_trace(go.Scatter(x=df.index, y=df['MA20'], line=dict(color='#2979FF', width=3),
-                                   name='MA20'), row=1, col=1)
-            fig.add_trace(go.Scatter(x=df.index, y=df['MA60'], line=dict(color='#9D4EDD', width=3),
-                                   name='MA60'), row=1, col=1)
-            
-            strong_buy = df[df['Strong_Buy'] == True]
-            normal_buy = df[(~df['Buy_Signal'].isna()) & (df['Strong_Buy'] == False)]
-            sell = df[~df['Sell_Signal'].isna()]
-            
-            if len(strong_buy) > 0:
-                fig.add_trace(go.Scatter(x=strong_buy.index, y=strong_buy['Buy_Signal'],
-                                       mode='markers+text',
-                                       marker=dict(symbol='triangle-up', size=25, color='#FF0000',
-                                                 line=dict(width=2, color='yellow')),
-                                       text=["적극매수"] * len(strong_buy),
-                                       textposition="bottom center",
-                                       textfont=dict(color='#FF0000', size=14),
-                                       name='적극매수'), row=1, col=1)
-            
-            if len(normal_buy) > 0:
-                fig.add_trace(go.Scatter(x=normal_buy.index, y=normal_buy['Buy_Signal'],
-                                       mode='markers+text',
-                                       marker=dict(symbol='triangle-up', size=15, color='#FF6B35'),
-                                       text=["매수"] * len(normal_buy),
-                                       textposition="bottom center",
-                                       textfont=dict(color='#FF6B35', size=11),
-                                       name='매수'), row=1, col=1)
-            
-            if len(sell) > 0:
-                fig.add_trace(go.Scatter(x=sell.index, y=sell['Sell_Signal'],
-                                       mode='markers+text',
-                                       marker=dict(symbol='triangle-down', size=18, color='#2979FF'),
-                                       text=["매도"] * len(sell),
-                                       textposition="top center",
-                                       textfont=dict(color='#2979FF', size=13),
-                                       name='매도'), row=1, col=1)
-            
-            colors = ['red' if row['Open'] <= row['Close'] else 'blue' for index, row in df.iterrows()]
-            fig.add_trace(go.Bar(x=df.index, y=df['Volume'], marker_color=colors,
-                               name='거래량'), row=2, col=1)
-            
-            fig.add_trace(go.Scatter(x=df.index, y=df['%K'], line=dict(color='#00E5FF', width=2),
-                                   name='%K'), row=3, col=1)
-            fig.add_trace(go.Scatter(x=df.index, y=df['%D'], line=dict(color='#FF6D00', width=2),
-                                   name='%D'), row=3, col=1)
-            fig.add_hline(y=oversold, line_dash="dash", line_color="#00E676", line_width=2, row=3, col=1)
-            fig.add_hline(y=overbought, line_dash="dash", line_color="#FF1744", line_width=2, row=3, col=1)
-            
-            fig.update_layout(height=700, template="plotly_dark", showlegend=False,
-                            hovermode="closest", dragmode='pan',
-                            margin=dict(l=50, r=80, t=30, b=40),
-                            paper_bgcolor="#000000", plot_bgcolor="#000000",
-                            xaxis_rangeslider_visible=False)
-            
-            fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128, 128, 128, 0.2)',
-                           range=[start_date, end_date],
-                           tickformat='%Y년 %m월')
-            
-            if currency == "KRW":
-                fig.update_yaxes(showgrid=True, gridcolor='rgba(128, 128, 128, 0.2)',
-                               side='right', tickformat=',', ticksuffix='원', row=1, col=1)
-            else:
-                fig.update_yaxes(showgrid=True, gridcolor='rgba(128, 128, 128, 0.2)',
-                               side='right', tickformat=',.2f', tickprefix='$', row=1, col=1)
-            
-            fig.update_yaxes(showgrid=True, gridcolor='rgba(128, 128, 128, 0.2)',
-                           side='right', row=2, col=1)
-            fig.update_yaxes(showgrid=True, gridcolor='rgba(128, 128, 128, 0.2)',
-                           side='right', range=[0, 100], row=3, col=1)
-            
             st.plotly_chart(fig, use_container_width=True, key=f"chart_{ticker}")
             st.markdown("---")
+        
+        # 나머지 종목은 요약표로 (차트 없이 마지막 봉 지표만)
+        # 렌더링 중에는 조회하지 않고 캐시된 줄만 보여 줌, 빈 줄은 백그라운드에서 채움 (다음 실행 때 표시)
+        rest = [ticker for ticker in chart_tickers if ticker not in tickers]
+        if rest:
+            st.markdown("#### 📋 다른 페이지 종목")
+            chart_grid.prefetch(rest, timeframe, chart_params, None)
+            rows = []
+            for i, ticker in enumerate(chart_tickers):
+                if ticker in tickers:
+                    continue
+                row = chart_grid.cached_summary(ticker, timeframe, chart_params) or chart_grid.placeholder_row(ticker)
+                rows.append({'페이지': i // charts_per_page + 1, **row})
+            st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True,
+                         column_config={col: st.column_config.NumberColumn(format="%.2f")
+                                        for col in ['현재가', '등락률(%)', '%K', '%D', 'RSI']})
+            pending = sum(row['신호'] == "준비 중" for row in rows)
+            if pending:
+                st.caption(f"⏳ {pending}개 종목 준비 중 · 다음 실행 때 표시")
 
 # TAB 2: 백테스팅
 with tab2:
     st.subheader("📈 백테스팅 결과")
     if analyze_btn:
-        tickers = [t.strip() for t in selected_tickers.split(',') if t.strip()]
+        tickers = selected_tickers
+        batch, errors = load_batch(tickers, timeframe)
         for ticker in tickers:
-            df, name, source, currency = get_data(ticker, timeframe)
-            if df is None or df.empty:
+            if ticker not in batch:
                 continue
+            df, name, source, currency = batch[ticker]
+            # TAB 1에서 계산한 지표/신호 재사용 (백테스트는 신호 유무와 종가만 사용)
+            df = analyze(ticker, timeframe, df, k_period, d_period, smooth_k,
+                         rsi_period, oversold, overbought)
             
-            df['MA5'] = df['Close'].rolling(window=5).mean()
-            df['MA20'] = df['Close'].rolling(window=20).mean()
-            df['MA60'] = df['Close'].rolling(window=60).mean()
-            df = calculate_stochastic(df, k_period, d_period, smooth_k)
-            df = calculate_rsi(df, rsi_period)
-            
-            df['Buy_Signal'] = None
-            df['Sell_Signal'] = None
-            for i in range(1, len(df)):
-                if (df['%K'].iloc[i-1] < df['%D'].iloc[i-1] and 
-                    df['%K'].iloc[i] > df['%D'].iloc[i] and 
-                    df['%K'].iloc[i] <= oversold):
-                    df.at[df.index[i], 'Buy_Signal'] = df['Close'].iloc[i]
-                elif (df['%K'].iloc[i-1] > df['%D'].iloc[i-1] and 
-                      df['%K'].iloc[i] < df['%D'].iloc[i] and 
-                      df['%K'].iloc[i] >= overbought):
-                    df.at[df.index[i], 'Sell_Signal'] = df['Close'].iloc[i]
-            
-            results = run_backtest(df, df)
+            with timed("backtest", ticker):
+                results = run_backtest(df, df, commission=commission, slippage=slippage)
             
             st.markdown(f"### 📊 {name} ({ticker})")
             
@@ -601,14 +513,279 @@ with tab2:
             
             st.markdown("---")
 
+    # 파라미터 최적화 (선택 종목 × 스토캐스틱 파라미터 전체 조합)
+    with st.expander("🔍 파라미터 최적화"):
+        col1, col2 = st.columns(2)
+        with col1:
+            opt_method = st.radio("탐색 방식", ["그리드", "랜덤"], horizontal=True)
+        with col2:
+            opt_samples = st.number_input("랜덤 샘플 수", value=2000, min_value=100,
+                                          max_value=50000, step=100)
+        opt_sort = st.selectbox("정렬 기준", ["total_return", "win_rate", "profit_loss_ratio"])
+        
+        if st.button("⚙️ 최적화 실행", use_container_width=True):
+            tickers = selected_tickers
+            batch, errors = load_batch(tickers, timeframe)
+            frames = {ticker: batch[ticker][0] for ticker in tickers if ticker in batch}
+            if frames:
+                with st.spinner(f"⚙️ {len(frames)}개 종목 파라미터 탐색 중..."):
+                    tables = optimize_many(frames,
+                                           method="random" if opt_method == "랜덤" else "grid",
+                                           n_samples=opt_samples, sort_by=opt_sort,
+                                           commission=commission, slippage=slippage)
+                for ticker, table in tables.items():
+                    st.markdown(f"#### {batch[ticker][1]} ({ticker})")
+                    st.dataframe(table, use_container_width=True, hide_index=True)
+            else:
+                st.warning("분석할 종목이 없습니다")
+    
+    # 워크포워드 검증 (학습 구간에서 고른 파라미터를 바로 다음 구간에서 평가)
+    with st.expander("🧪 워크포워드 검증"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            wf_folds = st.number_input("fold 수", value=10, min_value=2, max_value=30)
+        with col2:
+            wf_train = st.slider("학습 구간 비율", 0.2, 0.8, 0.5, 0.05)
+        with col3:
+            wf_samples = st.number_input("fold당 탐색 조합 수", value=500, min_value=50,
+                                         max_value=20000, step=50)
+        
+        if st.button("🧪 검증 실행", use_container_width=True):
+            tickers = selected_tickers
+            batch, errors = load_batch(tickers, timeframe)
+            frames = {ticker: batch[ticker][0] for ticker in tickers if ticker in batch}
+            if frames:
+                with st.spinner(f"🧪 {len(frames)}개 종목 × {wf_folds}개 fold 검증 중..."):
+                    st.session_state.wf_results = (
+                        walk_forward_many(frames, n_folds=wf_folds, train_fraction=wf_train,
+                                          n_samples=wf_samples, sort_by=opt_sort,
+                                          commission=commission, slippage=slippage),
+                        {ticker: batch[ticker][1] for ticker in frames})
+            else:
+                st.warning("분석할 종목이 없습니다")
+        
+        if st.session_state.get("wf_results"):
+            wf_results, wf_names = st.session_state.wf_results
+            summary = pd.DataFrame([{
+                '종목': f"{wf_names[ticker]} ({ticker})",
+                'OOS 수익률(%)': wf.stats['oos_return'], 'OOS MDD(%)': wf.stats['oos_mdd'],
+                '학습 평균(%)': wf.stats['train_return_mean'], '검증 평균(%)': wf.stats['fold_return_mean'],
+                '검증 표준편차(%)': wf.stats['fold_return_std'], '수익 fold(%)': wf.stats['positive_folds'],
+                'WFE': wf.stats['wfe'], '파라미터 일관성(%)': wf.stats['param_consistency'],
+                'OOS 거래': wf.stats['oos_trades'], '강제 청산': wf.stats['oos_open_at_end']
+            } for ticker, wf in wf_results.items()])
+            st.dataframe(summary.sort_values('OOS 수익률(%)', ascending=False), use_container_width=True,
+                         hide_index=True,
+                         column_config={col: st.column_config.NumberColumn(format="%.2f")
+                                        for col in summary.columns if col not in ('종목', 'OOS 거래', '강제 청산')})
+            st.caption("WFE: 검증 구간 봉당 수익률 ÷ 학습 구간 봉당 수익률 · 파라미터 일관성: 가장 많이 선택된 조합의 fold 비율 · "
+                       "OOS 거래: 검증 창 끝에서 보유 중이라 마지막 종가로 청산한 거래(강제 청산) 포함")
+            
+            combined = combined_equity(wf_results)
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=combined.index, y=combined.values, name="동일 비중 OOS",
+                                     line=dict(color='#a855f7', width=2)))
+            wf_ticker = st.selectbox("종목별 fold 결과", list(wf_results),
+                                     format_func=lambda ticker: f"{wf_names[ticker]} ({ticker})")
+            equity = wf_results[wf_ticker].equity
+            fig.add_trace(go.Scatter(x=equity.index, y=equity.values, name=wf_names[wf_ticker],
+                                     line=dict(color='#22c55e', width=1.5)))
+            fig.update_layout(template="plotly_dark", height=350, margin=dict(l=10, r=10, t=30, b=10),
+                              title="검증 구간 자산 곡선 (이어 붙임)")
+            st.plotly_chart(fig, use_container_width=True)
+            st.dataframe(wf_results[wf_ticker].folds, use_container_width=True, hide_index=True)
+    
+    # 몬테카를로 (실현된 거래 순서 하나가 아닌 수익률/낙폭 분포로 결과의 취약성 확인)
+    with st.expander("🎲 몬테카를로 분석"):
+        mc_methods = {"거래 복원추출": "bootstrap", "거래 순서 섞기": "shuffle", "봉 수익률 블록 추출": "block"}
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            mc_method = mc_methods[st.radio("방식", list(mc_methods), horizontal=True)]
+        with col2:
+            mc_paths = st.number_input("경로 수", value=montecarlo.DEFAULT_PATHS, min_value=100,
+                                       max_value=100000, step=1000)
+        with col3:
+            mc_ruin = st.slider("파산 기준 (시작 대비 손실 %)", 10, 90, int(montecarlo.RUIN_LEVEL * 100), 5)
+        
+        if st.button("🎲 시뮬레이션 실행", use_container_width=True):
+            tickers = selected_tickers
+            batch, errors = load_batch(tickers, timeframe)
+            series = {}
+            for ticker in tickers:
+                if ticker not in batch:
+                    continue
+                df = analyze(ticker, timeframe, batch[ticker][0], k_period, d_period, smooth_k,
+                             rsi_period, oversold, overbought)
+                results = run_backtest(df, df, commission=commission, slippage=slippage)
+                series[ticker] = (montecarlo.bar_returns(results['equity_curve']) if mc_method == "block"
+                                  else results['trade_returns'])
+            if series:
+                with st.spinner(f"🎲 {len(series)}개 종목 × {mc_paths:,}개 경로 시뮬레이션 중..."):
+                    st.session_state.mc_results = (
+                        montecarlo.simulate_many(series, n_paths=mc_paths, method=mc_method, seed=0,
+                                                 ruin_level=mc_ruin / 100),
+                        {ticker: batch[ticker][1] for ticker in series},
+                        {ticker: len(values) for ticker, values in series.items()})
+            else:
+                st.warning("분석할 종목이 없습니다")
+        
+        if st.session_state.get("mc_results"):
+            mc_results, mc_names, mc_lengths = st.session_state.mc_results
+            summary = pd.DataFrame([{
+                '종목': f"{mc_names[ticker]} ({ticker})", '표본 수': mc_lengths[ticker],
+                '수익률 5%': stats['return_p5'], '수익률 중앙값': stats['return_p50'],
+                '수익률 95%': stats['return_p95'], 'CVaR 5%': stats['cvar_5'],
+                'MDD 중앙값': stats['drawdown_p50'], 'MDD 95%': stats['drawdown_p95'],
+                '손실 확률(%)': stats['prob_loss'], '파산 확률(%)': stats['risk_of_ruin']
+            } for ticker, (simulation, stats) in mc_results.items()])
+            st.dataframe(summary, use_container_width=True, hide_index=True,
+                         column_config={col: st.column_config.NumberColumn(format="%.2f")
+                                        for col in summary.columns if col not in ('종목', '표본 수')})
+            st.caption("수익률/MDD 단위 % · CVaR 5%: 하위 5% 경로 평균 수익률 · 표본 수: 거래 수(블록 방식은 봉 수)")
+            
+            mc_ticker = st.selectbox("종목별 분포", list(mc_results),
+                                     format_func=lambda ticker: f"{mc_names[ticker]} ({ticker})")
+            simulation = mc_results[mc_ticker][0]
+            fig = make_subplots(rows=1, cols=2, subplot_titles=("최종 수익률 (%)", "최대 낙폭 (%)"))
+            fig.add_trace(go.Histogram(x=simulation.final_returns, nbinsx=80, marker_color='#22c55e'),
+                          row=1, col=1)
+            fig.add_trace(go.Histogram(x=simulation.max_drawdowns, nbinsx=80, marker_color='#ef4444'),
+                          row=1, col=2)
+            fig.update_layout(template="plotly_dark", height=320, showlegend=False,
+                              margin=dict(l=10, r=10, t=40, b=10))
+            st.plotly_chart(fig, use_container_width=True)
+
 # TAB 3: 포트폴리오
 with tab3:
     st.subheader("💼 포트폴리오")
+    col1, col2 = st.columns(2)
+    with col1:
+        max_positions = st.number_input("최대 보유 종목 수", value=10, min_value=1, max_value=100)
+    with col2:
+        sizing_kr = st.radio("비중 방식", ["균등", "변동성 역가중"], horizontal=True)
+    
     if analyze_btn:
-        st.info("포트폴리오 기능 업데이트 예정")
+        tickers = selected_tickers
+        batch, errors = load_batch(tickers, timeframe)
+        # 차트/백테스트 탭과 같은 지표·신호 결과 재사용
+        frames = {ticker: analyze(ticker, timeframe, batch[ticker][0], k_period, d_period, smooth_k,
+                                  rsi_period, oversold, overbought)
+                  for ticker in tickers if ticker in batch}
+        
+        if frames:
+            with timed("portfolio"):
+                portfolio = simulate_portfolio(frames, max_positions=max_positions,
+                                               sizing="volatility" if sizing_kr == "변동성 역가중" else "equal",
+                                               commission=commission, slippage=slippage)
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.markdown(f"""
+                <div class='metric-card'>
+                    <div style='color: #888; font-size: 14px;'>총 수익률</div>
+                    <div style='font-size: 32px; font-weight: bold; color: {"#22c55e" if portfolio['total_return'] > 0 else "#ef4444"};'>
+                        {portfolio['total_return']:+.2f}%
+                    </div>
+                </div>
+                """, unsafe_allow_html=True)
+            with col2:
+                st.markdown(f"""
+                <div class='metric-card'>
+                    <div style='color: #888; font-size: 14px;'>MDD</div>
+                    <div style='font-size: 32px; font-weight: bold; color: #ef4444;'>
+                        {portfolio['max_drawdown']:.2f}%
+                    </div>
+                </div>
+                """, unsafe_allow_html=True)
+            with col3:
+                st.markdown(f"""
+                <div class='metric-card'>
+                    <div style='color: #888; font-size: 14px;'>평균 투자 비중</div>
+                    <div style='font-size: 32px; font-weight: bold; color: #3b82f6;'>
+                        {portfolio['avg_exposure']:.1f}%
+                    </div>
+                </div>
+                """, unsafe_allow_html=True)
+            
+            fig = make_subplots(rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.03,
+                              row_heights=[0.6, 0.2, 0.2])
+            fig.add_trace(go.Scatter(x=portfolio['equity'].index, y=portfolio['equity'],
+                                   line=dict(color='#22c55e', width=2), name='자산'), row=1, col=1)
+            fig.add_trace(go.Scatter(x=portfolio['drawdown'].index, y=portfolio['drawdown'],
+                                   line=dict(color='#ef4444', width=1), fill='tozeroy',
+                                   name='낙폭(%)'), row=2, col=1)
+            fig.add_trace(go.Scatter(x=portfolio['exposure'].index, y=portfolio['exposure'],
+                                   line=dict(color='#3b82f6', width=1), fill='tozeroy',
+                                   name='투자 비중(%)'), row=3, col=1)
+            fig.update_layout(height=600, template="plotly_dark", showlegend=False,
+                            margin=dict(l=50, r=80, t=30, b=40),
+                            paper_bgcolor="#000000", plot_bgcolor="#000000")
+            fig.update_yaxes(showgrid=True, gridcolor='rgba(128, 128, 128, 0.2)', side='right')
+            st.plotly_chart(fig, use_container_width=True, key="portfolio_chart")
+        else:
+            st.warning("분석할 종목이 없습니다")
 
 # TAB 4: 종목 랭킹
 with tab4:
     st.subheader("🏆 종목 랭킹")
     if analyze_btn:
-        st.info("종목 랭킹 기능 업데이트 예정")
\ No newline at end of file
+        tickers = selected_tickers
+        batch, errors = load_batch(tickers, timeframe)
+        frames = {ticker: batch[ticker][0] for ticker in tickers if ticker in batch}
+        
+        if frames:
+            with timed("screener"):
+                ranking = screen(frames, k_period, d_period, smooth_k, rsi_period, oversold, overbought,
+                                 commission=commission, slippage=slippage)
+            ranking.insert(1, 'name', [batch[ticker][1] for ticker in ranking['ticker']])
+            ranking = ranking.rename(columns={
+                'ticker': '종목코드', 'name': '종목명', 'close': '현재가',
+                'Strong_Buy': '적극매수', 'Buy_Signal': '매수', 'Sell_Signal': '매도',
+                'recent_return': '최근수익률(%)', 'total_return': '백테스트 수익률(%)',
+                'win_rate': '승률(%)', 'max_drawdown': 'MDD(%)', 'total_trades': '거래수',
+                'score': '점수'
+            })
+            st.dataframe(ranking, use_container_width=True, hide_index=True,
+                         column_config={col: st.column_config.NumberColumn(format="%.2f")
+                                        for col in ['%K', '%D', 'RSI', '최근수익률(%)',
+                                                    '백테스트 수익률(%)', '승률(%)', 'MDD(%)', '점수']})
+        else:
+            st.warning("분석할 종목이 없습니다")
+
+# 진단 (이번 세션까지 누적된 단계별 소요 시간 / 캐시 적중 / 받은 데이터 크기)
+with st.sidebar:
+    with st.expander("🩺 진단"):
+        stats = instrumentation.snapshot()
+        if stats['stages']:
+            st.markdown("**단계별 소요 시간**")
+            st.dataframe(pd.DataFrame([
+                {'단계': stage, '횟수': stat['count'], '합계(ms)': stat['total'] * 1000,
+                 '평균(ms)': stat['total'] / stat['count'] * 1000, '최대(ms)': stat['max'] * 1000}
+                for stage, stat in stats['stages'].items()
+            ]), use_container_width=True, hide_index=True)
+        if stats['caches']:
+            st.markdown("**캐시 적중**")
+            st.dataframe(pd.DataFrame([
+                {'캐시': cache, '적중': stat['hit'], '미스': stat['miss'],
+                 '적중률(%)': stat['hit'] / (stat['hit'] + stat['miss']) * 100}
+                for cache, stat in stats['caches'].items()
+            ]), use_container_width=True, hide_index=True)
+        if stats['tickers']:
+            st.markdown("**종목별 최근 소요 시간(ms)**")
+            per_ticker = pd.DataFrame({ticker: {stage: stat['last'] * 1000 for stage, stat in by_stage.items()}
+                                       for ticker, by_stage in stats['tickers'].items()}).T
+            per_ticker['받은 데이터(KB)'] = pd.Series(stats['bytes_fetched']) / 1024
+            st.dataframe(per_ticker.round(1), use_container_width=True)
+        if not (stats['stages'] or stats['caches']):
+            st.caption("아직 기록이 없습니다")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("JSON", instrumentation.export_json(), file_name="diagnostics.json",
+                               mime="application/json", use_container_width=True)
+        with col2:
+            st.download_button("Prometheus", instrumentation.export_prometheus(), file_name="diagnostics.prom",
+                               mime="text/plain", use_container_width=True)
+        if st.button("🧹 초기화", use_container_width=True):
+            instrumentation.reset()
+            st.rerun()
@@ -0,0 +1,288 @@
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait
+import bar_store
+import providers
+import resample
+import symbols
+from compact import compact_bars
+from instrumentation import timed, record_cache, record_bytes
+
+# 봉별 기간 설정
+TIMEFRAME_CONFIG = {
+    "1m": {"period": "7d", "interval": "1m"},
+    "5m": {"period": "60d", "interval": "5m"},
+    "15m": {"period": "60d", "interval": "15m"},
+    "30m": {"period": "60d", "interval": "30m"},
+    "60m": {"period": "730d", "interval": "60m"},
+    "1h": {"period": "730d", "interval": "1h"},
+    "1d": {"period": "2y", "interval": "1d"},
+    "1wk": {"period": "10y", "interval": "1wk"},
+    "1mo": {"period": "20y", "interval": "1mo"}
+}
+
+DEFAULT_CONFIG = {"period": "2y", "interval": "1d"}
+
+# 직접 받아 저장하는 기본 봉과 보관 기간 (나머지 봉은 기본 봉을 집계해서 만듦)
+BASE_PERIODS = {"1m": "7d", "5m": "60d", "1h": "730d", "1d": "20y"}
+DERIVED_FROM = {"15m": "5m", "30m": "5m", "1wk": "1d", "1mo": "1d"}
+# 같은 데이터를 다른 이름으로 부르는 봉
+ALIASES = {"60m": "1h"}
+
+# 봉별 갱신 주기(초): 이 시간 안에 갱신된 기본 봉은 네트워크 없이 저장소에서 바로 사용
+REFRESH_TTL = {"1m": 30, "5m": 60, "15m": 120, "30m": 180, "60m": 300, "1h": 300,
+               "1d": 900, "1wk": 3600, "1mo": 6 * 3600}
+DEFAULT_TTL = 300
+# 갱신 주기가 지났어도 이 배수 이내면 저장된 봉을 먼저 돌려주고 백그라운드에서 갱신
+STALE_FACTOR = 10
+
+# (종목, 기본 봉) → [잠금, 사용 중인 요청 수] (마지막 요청이 끝나면 제거해 종목 수만큼 쌓이지 않음)
+_flight_locks = {}
+_revalidating = set()
+_guard = threading.Lock()
+
+# 요청 1건당 제한 시간(초)과 일괄 조회 동시 실행 수
+REQUEST_TIMEOUT = 10
+MAX_WORKERS = 8
+
+# 백그라운드 갱신 전용 풀 (오래된 종목이 많아도 동시 요청은 MAX_WORKERS개까지)
+_revalidator = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="revalidate")
+
+
+# 데이터 제공자에 봉 요청 (소요 시간과 받은 데이터 크기 기록)
+# ticker: 진단 기록용 사용자 입력 종목코드 (다른 단계와 같은 행에 모이도록, 기본: symbol)
+def _history(symbol, interval, ticker=None, **kwargs):
+    with timed("network", ticker or symbol):
+        df = providers.get_provider().history(symbol, interval, timeout=REQUEST_TIMEOUT, **kwargs)
+    if df is not None:
+        record_bytes(ticker or symbol, df.memory_usage(index=True).sum())
+    return df
+
+
+# (종목, 기본 봉)별 잠금: 같은 봉을 여러 세션이 동시에 요청하면 한 번만 조회
+@contextmanager
+def _flight_lock(key):
+    with _guard:
+        entry = _flight_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _flight_locks[key]
+
+
+def _fresh(symbol, base, ttl):
+    age = bar_store.bar_age(symbol, base)
+    return age is not None and age < ttl
+
+
+# 기본 봉 갱신 (저장된 마지막 봉 이후만 네트워크 요청)
+def _refresh_base(symbol, base, ticker=None):
+    period = BASE_PERIODS[base]
+
+    def fetch(start):
+        if start is None:
+            return _history(symbol, base, ticker, period=period)
+        return _history(symbol, base, ticker, start=start)
+
+    df = bar_store.refresh_bars(symbol, base, period, fetch)
+    bar_store.mark_checked(symbol, base)
+    return df
+
+
+def _revalidate(symbol, base, ttl, ticker=None):
+    try:
+        with _flight_lock((symbol, base)):
+            if not _fresh(symbol, base, ttl):
+                _refresh_base(symbol, base, ticker)
+    except Exception:
+        pass
+    finally:
+        with _guard:
+            _revalidating.discard((symbol, base))
+
+
+# 기본 봉 조회: 갱신 주기 이내 → 저장소, 조금 지남 → 저장소 + 백그라운드 갱신,
+# 그 외 → 직접 갱신 (동시에 들어온 같은 요청은 먼저 온 조회 결과를 기다려 사용)
+def load_base(symbol, base, ttl=DEFAULT_TTL, ticker=None):
+    age = bar_store.bar_age(symbol, base)
+    if age is not None and age < ttl * STALE_FACTOR:
+        df = bar_store.load_bars(symbol, base)
+        if df is not None:
+            record_cache("bar_store", True)
+            if age >= ttl:
+                with _guard:
+                    start = (symbol, base) not in _revalidating
+                    _revalidating.add((symbol, base))
+                if start:
+                    _revalidator.submit(_revalidate, symbol, base, ttl, ticker)
+            return df
+    record_cache("bar_store", False)
+
+    with _flight_lock((symbol, base)):
+        if _fresh(symbol, base, ttl):
+            df = bar_store.load_bars(symbol, base)
+            if df is not None:
+                return df
+        return _refresh_base(symbol, base, ticker)
+
+
+# 로컬 저장소를 거쳐 봉 조회 (상위 봉은 기본 봉을 메모리에서 집계)
+def load_history(symbol, config, ticker=None):
+    interval = ALIASES.get(config["interval"], config["interval"])
+    base = DERIVED_FROM.get(interval, interval)
+    df = load_base(symbol, base, REFRESH_TTL.get(interval, DEFAULT_TTL), ticker)
+    if df is not None and not df.empty and base != interval:
+        df = resample.derive(symbol, df, interval, ticker)
+    return bar_store.trim_to_period(df, config["period"])
+
+
+# 종목 1개 조회 (실패 시 예외 발생)
+def _fetch(ticker, timeframe):
+    clean_ticker = ticker.strip().upper()
+    config = TIMEFRAME_CONFIG.get(timeframe, DEFAULT_CONFIG)
+
+    entry = symbols.lookup(clean_ticker)
+    record_cache("symbols", entry is not None)
+
+    if clean_ticker.isdigit() and len(clean_ticker) == 6:
+        name = entry.name if entry else clean_ticker
+        if entry and entry.suffix:
+            # 종목 마스터에 시장이 있으면 .KS/.KQ 탐색 생략
+            suffixes = [entry.suffix]
+        else:
+            # 이미 저장된 시장이 있으면 그쪽부터 조회
+            suffixes = [".KS", ".KQ"]
+            base = ALIASES.get(config["interval"], config["interval"])
+            if bar_store.has_bars(clean_ticker + ".KQ", DERIVED_FROM.get(base, base)):
+                suffixes.reverse()
+
+        for suffix in suffixes:
+            df = load_history(clean_ticker + suffix, config, ticker)
+            if df is not None and not df.empty:
+                if not (entry and entry.suffix):
+                    symbols.remember(clean_ticker, suffix, name)
+                break
+
+        source = "야후 파이낸스 (KRX)"
+        currency = "KRW"
+    else:
+        df = load_history(clean_ticker, config, ticker)
+        source = "야후 파이낸스 (US)"
+        currency = "USD"
+        if entry:
+            name = entry.name
+        else:
+            try:
+                name = providers.get_provider().display_name(clean_ticker) or clean_ticker
+                if name != clean_ticker:
+                    symbols.remember(clean_ticker, "", name)
+            except:
+                name = clean_ticker
+
+    if df is None or df.empty:
+        raise LookupError("데이터 없음")
+
+    return compact_bars(df), name, source, currency
+
+
+# 이미 조회한 적 있는 종목의 야후 심볼 (종목 마스터 → 저장소 순으로 확인)
+def yahoo_symbol(ticker, base="1d"):
+    clean_ticker = ticker.strip().upper()
+    if not (clean_ticker.isdigit() and len(clean_ticker) == 6):
+        return clean_ticker
+    entry = symbols.lookup(clean_ticker)
+    if entry and entry.suffix:
+        return clean_ticker + entry.suffix
+    if bar_store.has_bars(clean_ticker + ".KQ", base):
+        return clean_ticker + ".KQ"
+    return clean_ticker + ".KS"
+
+
+# since 이후 봉만 조회 (실시간 감시용, 저장소 전체를 읽지 않음)
+# 집계 봉은 since가 속한 구간 시작부터 기본 봉을 받아 마지막 구간들만 다시 집계
+def fetch_latest(ticker, timeframe, since):
+    config = TIMEFRAME_CONFIG.get(timeframe, DEFAULT_CONFIG)
+    interval = ALIASES.get(config["interval"], config["interval"])
+    base = DERIVED_FROM.get(interval, interval)
+    symbol = yahoo_symbol(ticker, base)
+    df = _history(symbol, base, ticker, start=since)
+    if df is None or df.empty:
+        return df
+    if base != interval:
+        df = resample.derive(symbol, df, interval, ticker)
+    return compact_bars(df)
+
+
+def _fetch_timed(ticker, timeframe):
+    with timed("get_data", ticker):
+        return _fetch(ticker, timeframe)
+
+
+# 한국 주식 데이터
+def fetch_data(ticker, timeframe="1d"):
+    try:
+        return _fetch_timed(ticker, timeframe)
+    except:
+        return None, None, None, None
+
+
+# 종목별 작업을 스레드 풀로 동시 실행
+# 반환: ({종목: 결과}, {종목: 에러 메시지})
+def run_batch(func, tickers, args_by_ticker, max_workers=MAX_WORKERS, timeout=None, cpu=None):
+    results = {}
+    errors = {}
+    if not tickers:
+        return results, errors
+
+    if timeout is None:
+        # 종목당 최대 2회(.KS → .KQ) 요청 기준 전체 제한 시간
+        timeout = REQUEST_TIMEOUT * 2 * max(1, -(-len(tickers) // max_workers)) + REQUEST_TIMEOUT
+
+    if cpu is not None:
+        func = _cpu_counted(func, cpu)
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(tickers)))
+    futures = {executor.submit(func, ticker, *args_by_ticker(ticker)): ticker for ticker in tickers}
+    done, not_done = wait(futures, timeout=timeout)
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    for future in done:
+        ticker = futures[future]
+        try:
+            results[ticker] = future.result()
+        except Exception as e:
+            errors[ticker] = str(e) or type(e).__name__
+    for future in not_done:
+        errors[futures[future]] = "시간 초과"
+
+    return results, errors
+
+
+# 작업 스레드의 CPU 시간(초)을 cpu 목록에 기록하는 래퍼 (실패한 작업도 기록)
+def _cpu_counted(func, cpu):
+    def counted(*args):
+        start = time.thread_time()
+        try:
+            return func(*args)
+        finally:
+            cpu.append(time.thread_time() - start)
+    return counted
+
+
+# 여러 종목 동시 조회
+# 반환: ({종목: (df, name, source, currency)}, {종목: 에러 메시지})
+# cpu: 목록을 주면 종목별 작업 스레드 CPU 시간을 추가 (백그라운드 작업의 CPU 예산 계산용)
+def fetch_many(tickers, timeframe="1d", max_workers=MAX_WORKERS, timeout=None, cpu=None):
+    tickers = list(dict.fromkeys(tickers))
+    return run_batch(_fetch_timed, tickers, lambda ticker: (timeframe,), max_workers, timeout, cpu)
+
+
+# 여러 종목 최신 봉 동시 조회 (since_by_ticker: {종목: 마지막 확정 봉 시각})
+def fetch_latest_many(since_by_ticker, timeframe, max_workers=MAX_WORKERS, timeout=None, cpu=None):
+    return run_batch(fetch_latest, list(since_by_ticker),
+                     lambda ticker: (timeframe, since_by_ticker[ticker]), max_workers, timeout, cpu)
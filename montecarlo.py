@@ -0,0 +1,140 @@
+from collections import namedtuple
+import numpy as np
+from instrumentation import timed
+
+# 시뮬레이션 방식
+# bootstrap: 거래별 수익률을 복원 추출 (거래 수 동일)
+# shuffle: 거래 순서만 섞음 (최종 수익률은 같고 낙폭 분포만 달라짐)
+# block: 봉별 수익률을 연속 구간(block_size) 단위로 복원 추출 (변동성 군집 유지)
+METHODS = ("bootstrap", "shuffle", "block")
+
+DEFAULT_PATHS = 10000
+BLOCK_SIZE = 20
+# 한 번에 만드는 경로 배치의 최대 원소 수 (경로 수 × 길이, 배치당 임시 배열 몇 개 × 8바이트)
+BATCH_ELEMENTS = 2000000
+# 자산이 시작 대비 이 비율 이상 줄어든 적이 있으면 파산으로 봄
+RUIN_LEVEL = 0.5
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# 경로별 결과 (%): 최종 수익률, 최대 낙폭, 시작 대비 최저 자산 변화
+Simulation = namedtuple("Simulation", ["final_returns", "max_drawdowns", "worst_returns"])
+
+
+# 수익률 행렬 (경로 × 단계) → 경로별 최종 수익률, 최대 낙폭, 최저 자산 (시작 자산 1 기준)
+def _path_stats(returns):
+    growth = np.cumprod(1 + returns, axis=1)
+    peak = np.maximum(np.maximum.accumulate(growth, axis=1), 1.0)
+    drawdown = 1 - (growth / peak).min(axis=1)
+    return growth[:, -1] - 1, drawdown, np.minimum(growth.min(axis=1), 1.0) - 1
+
+
+# 경로 배치의 인덱스 (배치 × 길이)
+def _sample_index(rng, batch, n, method):
+    if method == "bootstrap":
+        return rng.integers(0, n, size=(batch, n))
+    return np.argsort(rng.random((batch, n)), axis=1)
+
+
+# 시작 위치별 길이 length 구간 요약 (로그 수익률 기준)
+# 반환: (구간 합계, 구간 안 최고 누적값, 최저 누적값, 구간 안 최대 낙폭) — 시작 위치 순 배열
+def _block_table(log_returns, length):
+    csum = np.concatenate(([0.0], np.cumsum(log_returns)))
+    starts = np.arange(len(log_returns) - length + 1)
+    prefix = csum[starts[:, None] + np.arange(1, length + 1)] - csum[starts][:, None]
+    peak = np.maximum(np.maximum.accumulate(prefix, axis=1), 0.0)
+    return prefix[:, -1], prefix.max(axis=1), prefix.min(axis=1), (peak - prefix).max(axis=1)
+
+
+# block 방식: 봉 단위 경로를 만들지 않고 구간 요약만 이어 붙임 (경로당 연산이 봉 수가 아니라 구간 수에 비례)
+# 구간 k의 낙폭 = max(직전 최고점 - 현재 수준 - 구간 최저 누적값, 구간 안 최대 낙폭)
+def _block_paths(log_returns, rng, batch, block_size):
+    n = len(log_returns)
+    block_size = max(1, min(block_size, n))
+    lengths = [block_size] * (n // block_size) + ([n % block_size] if n % block_size else [])
+    tables = {length: _block_table(log_returns, length) for length in set(lengths)}
+
+    level = np.zeros(batch)
+    peak = np.zeros(batch)
+    low = np.zeros(batch)
+    drawdown = np.zeros(batch)
+    for length in lengths:
+        total, high, lowest, inner = tables[length]
+        start = rng.integers(0, len(total), size=batch)
+        drawdown = np.maximum(drawdown, np.maximum(peak - level - lowest[start], inner[start]))
+        low = np.minimum(low, level + lowest[start])
+        peak = np.maximum(peak, level + high[start])
+        level += total[start]
+    return np.expm1(level), -np.expm1(-drawdown), np.expm1(low)
+
+
+# returns: 거래별(bootstrap/shuffle) 또는 봉별(block) 수익률 (비율)
+# 경로를 배치 단위로 만들어 요약값만 남김 (메모리는 배치 크기 + 경로 수에 비례)
+def simulate(returns, n_paths=DEFAULT_PATHS, method="bootstrap", block_size=BLOCK_SIZE,
+             seed=None, batch_elements=BATCH_ELEMENTS):
+    if method not in METHODS:
+        raise ValueError(f"지원하지 않는 방식: {method}")
+    returns = np.asarray(returns, dtype=np.float64)
+    returns = returns[np.isfinite(returns)]
+    final = np.zeros(n_paths)
+    drawdown = np.zeros(n_paths)
+    worst = np.zeros(n_paths)
+    n = len(returns)
+    if n == 0:
+        return Simulation(final, drawdown, worst)
+
+    rng = np.random.default_rng(seed)
+    batch = max(1, batch_elements // n)
+    if method == "block":
+        with np.errstate(divide='ignore'):
+            log_returns = np.log1p(returns)
+    for start in range(0, n_paths, batch):
+        size = min(batch, n_paths - start)
+        if method == "block":
+            batch_final, batch_drawdown, batch_worst = _block_paths(log_returns, rng, size, block_size)
+        else:
+            index = _sample_index(rng, size, n, method)
+            batch_final, batch_drawdown, batch_worst = _path_stats(returns[index])
+        final[start:start + size] = batch_final
+        drawdown[start:start + size] = batch_drawdown
+        worst[start:start + size] = batch_worst
+    return Simulation(final * 100, drawdown * 100, worst * 100)
+
+
+# 자산 곡선 → 봉별 수익률 (block 방식 입력)
+def bar_returns(equity_curve):
+    equity = np.asarray(equity_curve, dtype=np.float64)
+    if len(equity) < 2:
+        return np.empty(0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return equity[1:] / equity[:-1] - 1
+
+
+# 분포 요약
+# return_p*/drawdown_p*: 백분위, cvar_5: 하위 5% 경로의 평균 수익률,
+# prob_loss: 손실로 끝난 경로 비율, risk_of_ruin: 자산이 ruin_level 이상 줄어든 적이 있는 경로 비율
+def summarize(simulation, percentiles=PERCENTILES, ruin_level=RUIN_LEVEL):
+    final = simulation.final_returns
+    drawdown = simulation.max_drawdowns
+    summary = {'paths': len(final), 'return_mean': float(final.mean()) if len(final) else 0.0}
+    for p, value in zip(percentiles, np.percentile(final, percentiles)):
+        summary[f'return_p{p}'] = float(value)
+    for p, value in zip(percentiles, np.percentile(drawdown, percentiles)):
+        summary[f'drawdown_p{p}'] = float(value)
+    tail = final[final <= np.percentile(final, 5)]
+    summary['cvar_5'] = float(tail.mean()) if len(tail) else 0.0
+    summary['prob_loss'] = float((final < 0).mean() * 100)
+    summary['risk_of_ruin'] = float((simulation.worst_returns <= -ruin_level * 100).mean() * 100)
+    return summary
+
+
+# 여러 종목 시뮬레이션 (종목마다 독립 난수열, 같은 seed면 같은 결과)
+# returns_by_ticker: {종목: 수익률 배열}, 반환: {종목: (Simulation, 요약)}
+def simulate_many(returns_by_ticker, n_paths=DEFAULT_PATHS, method="bootstrap", block_size=BLOCK_SIZE,
+                  seed=None, ruin_level=RUIN_LEVEL):
+    seeds = np.random.SeedSequence(seed).spawn(len(returns_by_ticker))
+    results = {}
+    for (ticker, returns), ticker_seed in zip(returns_by_ticker.items(), seeds):
+        with timed("montecarlo", ticker):
+            simulation = simulate(returns, n_paths, method, block_size, ticker_seed)
+        results[ticker] = (simulation, summarize(simulation, ruin_level=ruin_level))
+    return results
@@ -0,0 +1,131 @@
+import itertools
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from backtest import backtest_arrays
+from signals import crosses
+from indicators import sma, rolling_min, rolling_max, STOCH_DECIMALS
+
+# 기본 탐색 범위: 사이드바 입력 범위(%K/%D/Smooth 1~20, 매수 0~50, 매도 50~100)를 좁힌 기본값
+# (자주 쓰는 구간만, 종목당 약 2만 조합 / 더 넓게 찾으려면 grid 인자나 랜덤 탐색 사용)
+DEFAULT_GRID = {
+    'k_period': range(3, 21),
+    'd_period': range(2, 11),
+    'smooth_k': range(1, 9),
+    'oversold': (15, 20, 25, 30),
+    'overbought': (70, 75, 80, 85),
+}
+
+PARAM_COLUMNS = ['k_period', 'd_period', 'smooth_k', 'oversold', 'overbought']
+METRIC_COLUMNS = ['total_return', 'win_rate', 'profit_loss_ratio', 'max_drawdown', 'total_trades']
+
+
+# indicators.stochastic과 같은 계산 (중간 결과를 조합 사이에 재사용)
+def _smoothed(values, window):
+    return np.round(sma(values, window), STOCH_DECIMALS)
+
+
+# 같은 k_period 조합들을 한 번에 평가 (rolling min/max는 한 번만 계산)
+# combos: [(d_period, smooth_k, oversold, overbought), ...]
+def _evaluate_k_group(close, high, low, k_period, combos, commission, slippage):
+    low_min = rolling_min(low, k_period)
+    high_max = rolling_max(high, k_period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        raw_k = 100 * ((close - low_min) / (high_max - low_min))
+
+    rows = []
+    smoothed = {}
+    for d_period, smooth_k, oversold, overbought in combos:
+        if smooth_k not in smoothed:
+            smoothed[smooth_k] = {'%K': _smoothed(raw_k, smooth_k)}
+        cache = smoothed[smooth_k]
+        k = cache['%K']
+        if d_period not in cache:
+            d = _smoothed(k, d_period)
+            cache[d_period] = (d, crosses(k, d))
+        d, (golden, dead) = cache[d_period]
+
+        buy = golden & (k <= oversold)
+        sell = dead & (k >= overbought)
+        result = backtest_arrays(close, buy, sell, commission, slippage)
+        rows.append((k_period, d_period, smooth_k, oversold, overbought,
+                     *(result[m] for m in METRIC_COLUMNS)))
+    return rows
+
+
+# 탐색할 파라미터 조합 (grid: 전체 조합, random: n_samples개 무작위 추출)
+def parameter_combos(grid=None, method="grid", n_samples=2000, seed=None):
+    grid = grid or DEFAULT_GRID
+    combos = [c for c in itertools.product(*(grid[p] for p in PARAM_COLUMNS)) if c[3] < c[4]]
+    if method == "random" and n_samples < len(combos):
+        combos = random.Random(seed).sample(combos, n_samples)
+    return combos
+
+
+# k_period별 작업 단위로 묶기
+def _group_by_k(combos):
+    groups = {}
+    for k_period, *rest in combos:
+        groups.setdefault(k_period, []).append(tuple(rest))
+    return groups
+
+
+# 조합 목록 전체 평가 (k_period별로 묶어 중간 결과 재사용)
+# 반환: [(파라미터..., 성과...), ...]
+def evaluate_combos(close, high, low, combos, commission=0.0, slippage=0.0):
+    rows = []
+    for k_period, group in _group_by_k(combos).items():
+        rows.extend(_evaluate_k_group(close, high, low, k_period, group, commission, slippage))
+    return rows
+
+
+# 성과 순위표 (최소 거래 수 미만 제외, 같은 성과면 MDD가 낮은 순)
+def rank_results(rows, sort_by, min_trades, top):
+    table = pd.DataFrame(rows, columns=PARAM_COLUMNS + METRIC_COLUMNS)
+    table = table[table['total_trades'] >= min_trades]
+    table = table.sort_values([sort_by, 'max_drawdown'], ascending=[False, True])
+    if top:
+        table = table.head(top)
+    return table.reset_index(drop=True)
+
+
+# 프로세스 풀 (fork 대신 forkserver, 없으면 spawn)
+# 앱 프로세스에는 워밍업/백그라운드 갱신/알림 스레드가 돌고 있어 fork하면 잡혀 있던 잠금이 복사될 수 있음
+def process_pool(workers=None):
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(method)
+    if method == "forkserver":
+        context.set_forkserver_preload(["optimizer", "walkforward"])
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+
+# 여러 종목 파라미터 탐색 (종목×k_period 단위로 프로세스 풀에 분배)
+# frames: {종목: OHLC DataFrame}, 반환: {종목: 성과 순위 DataFrame}
+def optimize_many(frames, grid=None, method="grid", n_samples=2000, seed=None,
+                  commission=0.0, slippage=0.0, sort_by='total_return', min_trades=1,
+                  top=20, workers=None):
+    groups = _group_by_k(parameter_combos(grid, method, n_samples, seed))
+    rows = {ticker: [] for ticker in frames}
+
+    with process_pool(workers) as executor:
+        futures = {}
+        for ticker, df in frames.items():
+            close = df['Close'].to_numpy(dtype=np.float64)
+            high = df['High'].to_numpy(dtype=np.float64)
+            low = df['Low'].to_numpy(dtype=np.float64)
+            for k_period, combos in groups.items():
+                future = executor.submit(_evaluate_k_group, close, high, low, k_period,
+                                         combos, commission, slippage)
+                futures[future] = ticker
+        for future, ticker in futures.items():
+            rows[ticker].extend(future.result())
+
+    return {ticker: rank_results(ticker_rows, sort_by, min_trades, top)
+            for ticker, ticker_rows in rows.items()}
+
+
+# 종목 1개 파라미터 탐색
+def optimize(df, **kwargs):
+    return optimize_many({'_': df}, **kwargs)['_']
@@ -0,0 +1,40 @@
+from indicators import add_moving_averages, calculate_stochastic, calculate_rsi
+from signals import add_signals
+from instrumentation import timed, record_cache
+from compact import FrameLRU, compact_analysis
+
+# 지표 계산 결과 캐시 크기 (종목×봉×파라미터 조합 수, 메모리는 다른 DataFrame 캐시와 함께 compact.CACHE_BYTES 이하)
+CACHE_SIZE = 256
+
+_cache = FrameLRU(CACHE_SIZE)
+
+
+# 같은 봉 데이터인지 판별하는 버전 (진행 중인 마지막 봉 갱신도 반영)
+def data_version(df):
+    last = df.iloc[-1]
+    return (len(df), df.index[0], df.index[-1], float(last['Close']), float(last['Volume']))
+
+
+def _compute(ticker, df, k_period, d_period, smooth_k, rsi_period, oversold, overbought):
+    with timed("indicators", ticker):
+        df = add_moving_averages(df.copy())
+        df = calculate_stochastic(df, k_period, d_period, smooth_k)
+        df = calculate_rsi(df, rsi_period)
+    with timed("signals", ticker):
+        return compact_analysis(add_signals(df, oversold, overbought))
+
+
+# 이동평균 + 스토캐스틱 + RSI + 매수/매도 신호
+# (종목, 봉, 데이터 버전, 파라미터)별로 한 번만 계산하고 모든 탭이 공유
+# 반환된 프레임은 공유 객체이므로 수정하지 말 것
+def analyze(ticker, timeframe, df, k_period, d_period, smooth_k, rsi_period, oversold, overbought):
+    key = (ticker, timeframe, data_version(df),
+           k_period, d_period, smooth_k, rsi_period, oversold, overbought)
+    cached = _cache.get(key)
+    record_cache("analyze", cached is not None)
+    if cached is not None:
+        return cached
+
+    result = _compute(ticker, df, k_period, d_period, smooth_k, rsi_period, oversold, overbought)
+    _cache.put(key, result)
+    return result
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+from backtest import INITIAL_CAPITAL
+
+
+# 시장/시간대가 다른 종목을 같은 날짜축에 맞추기
+# 일봉 이상은 현지 날짜 기준, 분봉은 UTC 기준
+def _align_index(index):
+    if index.tz is None:
+        return index
+    if (index == index.normalize()).all():
+        return index.tz_localize(None)
+    return index.tz_convert('UTC').tz_localize(None)
+
+
+# 종목별 신호 프레임 → 공통 날짜축의 (날짜 × 종목) 종가/매수/매도 행렬
+def align_signals(frames):
+    closes, buys, sells = {}, {}, {}
+    for ticker, df in frames.items():
+        index = _align_index(df.index)
+        closes[ticker] = pd.Series(df['Close'].to_numpy(dtype=np.float64), index=index)
+        buys[ticker] = pd.Series(~df['Buy_Signal'].isna().to_numpy(), index=index)
+        sells[ticker] = pd.Series(~df['Sell_Signal'].isna().to_numpy(), index=index)
+
+    close = pd.DataFrame(closes).sort_index()
+    buy = pd.DataFrame(buys).reindex(close.index).fillna(False).astype(bool)
+    sell = pd.DataFrame(sells).reindex(close.index).fillna(False).astype(bool)
+    return close, buy, sell
+
+
+# (날짜 × 종목) 신호 행렬 → 보유 상태 (마지막 신호를 앞으로 채움)
+def position_matrix(buy, sell):
+    n = buy.shape[0]
+    event = np.full(buy.shape, -1, dtype=np.int8)
+    event[sell] = 0
+    event[buy] = 1
+    rows = np.arange(n)[:, None]
+    last = np.maximum.accumulate(np.where(event >= 0, rows, -1), axis=0)
+    cols = np.arange(buy.shape[1])[None, :]
+    state = np.where(last >= 0, event[np.maximum(last, 0), cols], 0)
+    return state.astype(bool)
+
+
+# 자리 수 제한: 진입 봉에 빈자리가 있을 때만 편입해 청산까지 보유
+# 자리가 없어 빠진 종목은 중간에 자리가 나도 편입하지 않고 다음 진입 신호를 기다림
+# 같은 봉 진입은 앞 열(종목 순서) 우선
+def admit_positions(state, max_positions):
+    # (종목 × 봉) 순서로 나열하면 같은 종목의 진입/청산이 차례로 짝을 이룸 (청산 봉은 보유 제외)
+    change = np.diff(state.astype(np.int8), axis=0, prepend=0, append=0).T
+    start_col, start_t = np.nonzero(change == 1)
+    end_t = np.nonzero(change == -1)[1]
+
+    held = np.zeros(state.shape, dtype=bool)
+    open_ends = []
+    # 진입 건수만큼만 반복 (같은 봉이면 앞 열 우선)
+    for i in np.lexsort((start_col, start_t)):
+        start = start_t[i]
+        open_ends = [end for end in open_ends if end > start]
+        if len(open_ends) < max_positions:
+            held[start:end_t[i], start_col[i]] = True
+            open_ends.append(end_t[i])
+    return held
+
+
+# 공유 자본 포트폴리오 시뮬레이션
+# max_positions: 동시 보유 종목 수 (한 종목 최대 비중 1/max_positions)
+# sizing: "equal" 균등 비중, "volatility" 변동성 역가중
+# 매일 목표 비중으로 리밸런싱, 비용은 회전율 × (수수료 + 슬리피지)
+def simulate_portfolio(frames, max_positions=10, sizing="equal", vol_window=20,
+                       commission=0.0, slippage=0.0, initial_capital=INITIAL_CAPITAL):
+    close, buy, sell = align_signals(frames)
+    state = position_matrix(buy.to_numpy(), sell.to_numpy())
+
+    held = admit_positions(state, max_positions)
+
+    returns = close.ffill().pct_change(fill_method=None).fillna(0).to_numpy()
+
+    if sizing == "volatility":
+        vol = close.ffill().pct_change(fill_method=None).rolling(vol_window, min_periods=2).std()
+        inv_vol = (1 / vol.replace(0, np.nan)).to_numpy()
+        inv_vol = np.where(held, np.nan_to_num(inv_vol, nan=0.0, posinf=0.0), 0.0)
+        total = inv_vol.sum(axis=1, keepdims=True)
+        n_held = held.sum(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weights = np.where(total > 0, inv_vol / total, 0.0) * n_held / max_positions
+        # 변동성 계산 전 구간은 균등 비중, 한 종목은 1/max_positions를 넘지 않음 (남는 비중은 현금)
+        weights = np.where((total == 0) & held, 1.0 / max_positions, weights)
+        weights = np.minimum(weights, 1.0 / max_positions)
+    else:
+        weights = held / max_positions
+
+    # t봉 종가에 정한 비중이 t+1봉 수익률에 적용됨
+    prev_weights = np.vstack([np.zeros((1, weights.shape[1])), weights[:-1]])
+    gross = (prev_weights * returns).sum(axis=1)
+    turnover = np.abs(np.diff(weights, axis=0, prepend=0)).sum(axis=1)
+    net = gross - turnover * (commission + slippage)
+
+    equity = initial_capital * np.cumprod(1 + net)
+    peak = np.maximum.accumulate(equity)
+    drawdown = (equity - peak) / peak * 100
+    exposure = weights.sum(axis=1) * 100
+
+    return {
+        'total_return': (equity[-1] / initial_capital - 1) * 100 if len(equity) else 0.0,
+        'max_drawdown': float(-drawdown.min()) if len(drawdown) else 0.0,
+        'avg_exposure': float(exposure.mean()) if len(exposure) else 0.0,
+        'equity': pd.Series(equity, index=close.index),
+        'drawdown': pd.Series(drawdown, index=close.index),
+        'exposure': pd.Series(exposure, index=close.index),
+        'weights': pd.DataFrame(weights, index=close.index, columns=close.columns),
+    }
@@ -0,0 +1,167 @@
+import os
+import threading
+import pandas as pd
+import bar_store
+
+# 데이터 제공자 선택 (환경변수 STOCK_DATA_PROVIDER)
+#   yahoo            야후 파이낸스 (기본)
+#   fdr              FinanceDataReader (일봉만)
+#   local:<경로>     미리 준비한 봉 아카이브만 사용 (오프라인 재생, replay:<경로>도 같음)
+#   record:<경로>    기본 제공자 응답을 아카이브에 기록하면서 사용
+PROVIDER_ENV = "STOCK_DATA_PROVIDER"
+
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _is_krx(symbol):
+    code = symbol.split(".")[0]
+    return code.isdigit() and len(code) == 6
+
+
+def _empty():
+    return pd.DataFrame(columns=OHLCV)
+
+
+# 야후 파이낸스
+class YahooProvider:
+    name = "yahoo"
+
+    def history(self, symbol, interval, period=None, start=None, timeout=None):
+        import yfinance as yf
+
+        kwargs = {"interval": interval}
+        if start is not None:
+            kwargs["start"] = start
+        else:
+            kwargs["period"] = period
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        return yf.Ticker(symbol).history(**kwargs)
+
+    def display_name(self, symbol):
+        import yfinance as yf
+
+        info = yf.Ticker(symbol).info
+        return info.get('longName', info.get('shortName'))
+
+
+# FinanceDataReader (네이버/KRX 일봉, 시간대는 야후와 같게 맞춤)
+class FdrProvider:
+    name = "fdr"
+
+    def history(self, symbol, interval, period=None, start=None, timeout=None):
+        import FinanceDataReader as fdr
+
+        if interval != "1d":
+            return _empty()
+        code = symbol.split(".")[0] if _is_krx(symbol) else symbol
+        if start is None:
+            start = pd.Timestamp.now() - bar_store.period_to_timedelta(period or "2y")
+        start = pd.Timestamp(start)
+        if start.tz is not None:
+            start = start.tz_localize(None)
+        df = fdr.DataReader(code, start.strftime("%Y-%m-%d"))
+        if df is None or df.empty:
+            return _empty()
+        df = df[[col for col in OHLCV if col in df.columns]]
+        if df.index.tz is None:
+            df = df.tz_localize("Asia/Seoul" if _is_krx(symbol) else "America/New_York")
+        return df
+
+    def display_name(self, symbol):
+        return None
+
+
+# 로컬 봉 아카이브 (bar_store와 같은 <경로>/<봉>/<심볼>.parquet 구조, .csv도 읽음)
+class ArchiveProvider:
+    name = "local"
+
+    def __init__(self, root):
+        self.root = root
+
+    # 아카이브는 야후 심볼(005930.KS) 기준, 시장 접미사가 다르거나 없으면 다른 시장 파일도 확인
+    def _load(self, symbol, interval):
+        candidates = [symbol]
+        if _is_krx(symbol):
+            code = symbol.split(".")[0]
+            candidates += [code + suffix for suffix in (".KS", ".KQ") if code + suffix != symbol]
+        for candidate in candidates:
+            df = bar_store.load_bars(candidate, interval, self.root)
+            if df is not None:
+                return df
+            path = os.path.join(self.root, interval, f"{candidate}.csv")
+            if os.path.exists(path):
+                return pd.read_csv(path, index_col=0, parse_dates=True)
+        return None
+
+    def history(self, symbol, interval, period=None, start=None, timeout=None):
+        df = self._load(symbol, interval)
+        if df is None or df.empty:
+            return _empty()
+        if start is not None:
+            start = pd.Timestamp(start)
+            if df.index.tz is not None and start.tz is None:
+                start = start.tz_localize(df.index.tz)
+            return df[df.index >= start]
+        if period is not None:
+            return bar_store.trim_to_period(df, period)
+        return df
+
+    def display_name(self, symbol):
+        return None
+
+
+# 다른 제공자의 응답을 아카이브에 누적 기록 (나중에 local:<경로>로 재생)
+class RecordingProvider:
+    def __init__(self, inner, root):
+        self.inner = inner
+        self.root = root
+        self.name = f"record({inner.name})"
+        self._lock = threading.Lock()
+
+    def history(self, symbol, interval, period=None, start=None, timeout=None):
+        df = self.inner.history(symbol, interval, period=period, start=start, timeout=timeout)
+        if df is not None and not df.empty:
+            with self._lock:
+                stored = bar_store.load_bars(symbol, interval, self.root)
+                bar_store.save_bars(symbol, interval, bar_store.merge_bars(stored, df), self.root)
+        return df
+
+    def display_name(self, symbol):
+        return self.inner.display_name(symbol)
+
+
+BACKENDS = {"yahoo": YahooProvider, "fdr": FdrProvider}
+
+_providers = {}
+_override = None
+_lock = threading.Lock()
+
+
+# "yahoo", "fdr", "local:<경로>", "replay:<경로>", "record:<경로>" → 제공자
+def from_spec(spec, base="yahoo"):
+    kind, _, path = spec.partition(":")
+    if kind in BACKENDS:
+        return BACKENDS[kind]()
+    if kind in ("local", "replay") and path:
+        return ArchiveProvider(path)
+    if kind == "record" and path:
+        return RecordingProvider(BACKENDS.get(base, YahooProvider)(), path)
+    raise ValueError(f"지원하지 않는 데이터 제공자: {spec}")
+
+
+# 현재 제공자 (set_provider로 지정한 것 → 환경변수 → default 순)
+def get_provider(default="yahoo"):
+    if _override is not None:
+        return _override
+    spec = os.environ.get(PROVIDER_ENV) or default
+    with _lock:
+        if (spec, default) not in _providers:
+            _providers[(spec, default)] = from_spec(spec, base=default)
+        return _providers[(spec, default)]
+
+
+# 코드에서 제공자 교체 (부하 테스트/벤치마크용, None이면 환경변수 설정으로 복귀)
+def set_provider(provider):
+    global _override
+    _override = provider
@@ -0,0 +1,59 @@
+import pandas as pd
+from pipeline import data_version
+from instrumentation import timed, record_cache
+from compact import FrameLRU
+
+# 분봉 집계 단위
+INTRADAY_RULES = {"15m": "15min", "30m": "30min", "60m": "60min", "1h": "60min"}
+# 일봉 → 주봉/월봉 (야후와 같이 주봉은 월요일, 월봉은 1일 기준 표시)
+CALENDAR_RULES = {"1wk": "W-MON", "1mo": "MS"}
+
+# 시장별 정규장 시작 시각 (없으면 그날 첫 봉 기준)
+SESSION_OPEN = {".KS": "09:00", ".KQ": "09:00"}
+
+OHLCV_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+CACHE_SIZE = 128
+
+_cache = FrameLRU(CACHE_SIZE)
+
+
+# 분봉 집계: 장 시작 시각부터 구간을 나눠 날짜(세션)를 넘지 않게 묶음
+# session_open: "HH:MM" 정규장 시작 시각, None이면 그날 첫 봉 시각
+def resample_intraday(df, rule, session_open=None):
+    step = pd.Timedelta(rule)
+    index = df.index
+    day = index.normalize()
+    if session_open:
+        session_open = day + pd.Timedelta(f"{session_open}:00")
+    else:
+        session_open = pd.DatetimeIndex(
+            pd.Series(index, index=index).groupby(day).transform("min"))
+    bucket = session_open + ((index - session_open) // step) * step
+    out = df[list(OHLCV_AGG)].groupby(bucket).agg(OHLCV_AGG)
+    out.index.name = df.index.name
+    return out
+
+
+def resample_calendar(df, rule):
+    out = df[list(OHLCV_AGG)].resample(rule, label="left", closed="left").agg(OHLCV_AGG)
+    return out.dropna(subset=["Open"])
+
+
+# 기본 봉(base_df) → interval 봉, 같은 기본 봉 버전이면 캐시 재사용
+# ticker: 진단 기록용 사용자 입력 종목코드 (기본: symbol)
+def derive(symbol, base_df, interval, ticker=None):
+    key = (symbol, interval, data_version(base_df))
+    cached = _cache.get(key)
+    record_cache("resample", cached is not None)
+    if cached is not None:
+        return cached
+
+    with timed("resample", ticker or symbol):
+        if interval in CALENDAR_RULES:
+            out = resample_calendar(base_df, CALENDAR_RULES[interval])
+        else:
+            suffix = symbol[symbol.rfind("."):] if "." in symbol else ""
+            out = resample_intraday(base_df, INTRADAY_RULES[interval], SESSION_OPEN.get(suffix))
+    _cache.put(key, out)
+    return out
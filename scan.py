@@ -0,0 +1,135 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from market_data import fetch_data
+from pipeline import analyze
+from backtest import run_backtest
+from watchlist import load_watchlist, select, parse_tickers
+
+# 대시보드 사이드바 기본값과 동일
+DEFAULT_PARAMS = {
+    'k_period': 8, 'd_period': 5, 'smooth_k': 5, 'rsi_period': 14,
+    'oversold': 25, 'overbought': 75,
+}
+
+
+# 종목 1개 분석: 대시보드와 같은 조회 → 지표/신호 → 백테스트
+# 반환: (요약 dict, 신호 발생 봉 DataFrame)
+def scan_ticker(ticker, timeframe, params, commission=0.0, slippage=0.0):
+    df, name, source, currency = fetch_data(ticker, timeframe)
+    if df is None or df.empty:
+        return {'ticker': ticker, 'error': '데이터 없음'}, None
+
+    df = analyze(ticker, timeframe, df, params['k_period'], params['d_period'], params['smooth_k'],
+                 params['rsi_period'], params['oversold'], params['overbought'])
+    results = run_backtest(df, df, commission=commission, slippage=slippage)
+    last = df.iloc[-1]
+
+    summary = {
+        'ticker': ticker, 'name': name, 'currency': currency, 'bars': len(df),
+        'time': df.index[-1], 'close': last['Close'],
+        '%K': last['%K'], '%D': last['%D'], 'RSI': last['RSI'],
+        'Strong_Buy': bool(last['Strong_Buy']),
+        'Buy_Signal': not pd.isna(last['Buy_Signal']),
+        'Sell_Signal': not pd.isna(last['Sell_Signal']),
+        'error': None,
+    }
+    # 배열 결과(자산 곡선, 거래별 수익률)는 요약 행에 넣지 않음
+    summary.update({key: value for key, value in results.items() if key not in ('equity_curve', 'trade_returns')})
+
+    buy = ~df['Buy_Signal'].isna()
+    sell = ~df['Sell_Signal'].isna()
+    signals = pd.DataFrame({
+        'ticker': ticker,
+        'time': df.index[buy | sell],
+        'signal': np.where(df['Strong_Buy'][buy | sell], '적극매수',
+                           np.where(buy[buy | sell], '매수', '매도')),
+        'close': df['Close'][buy | sell].to_numpy(),
+        '%K': df['%K'][buy | sell].to_numpy(),
+        '%D': df['%D'][buy | sell].to_numpy(),
+    })
+    return summary, signals
+
+
+def _scan_safe(ticker, timeframe, params, commission, slippage):
+    try:
+        return scan_ticker(ticker, timeframe, params, commission, slippage)
+    except Exception as e:
+        return {'ticker': ticker, 'error': str(e) or type(e).__name__}, None
+
+
+# 여러 종목을 프로세스 풀로 분석 → (요약 DataFrame, 신호 DataFrame)
+def scan(tickers, timeframe="1d", params=None, commission=0.0, slippage=0.0, workers=None):
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    tickers = list(dict.fromkeys(tickers))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        outputs = list(executor.map(_scan_safe, tickers, [timeframe] * len(tickers),
+                                    [params] * len(tickers), [commission] * len(tickers),
+                                    [slippage] * len(tickers), chunksize=8))
+
+    summary = pd.DataFrame([summary for summary, _ in outputs])
+    frames = [signals for _, signals in outputs if signals is not None and not signals.empty]
+    signals = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return summary, signals
+
+
+# 확장자에 따라 Parquet/CSV 저장 (시각은 문자열로: 시장마다 시간대가 달라 한 컬럼에 섞임)
+def write_table(df, path):
+    df = df.copy()
+    if 'time' in df.columns:
+        df['time'] = df['time'].astype(str)
+    if path.endswith('.parquet'):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False, encoding='utf-8-sig')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="스토캐스틱/RSI 신호 + 백테스트 일괄 스캔")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--tickers', help="쉼표로 구분한 종목코드 (예: 005930,000660)")
+    source.add_argument('--sheet', help="종목코드/테마 컬럼이 있는 구글 시트 URL 또는 CSV 경로")
+    parser.add_argument('--themes', help="시트에서 사용할 테마 (쉼표 구분, 기본: 전체)")
+    parser.add_argument('--timeframe', default="1d",
+                        choices=["1m", "5m", "15m", "30m", "60m", "1h", "1d", "1wk", "1mo"])
+    parser.add_argument('--k', type=int, default=DEFAULT_PARAMS['k_period'], help="Fast %%K")
+    parser.add_argument('--d', type=int, default=DEFAULT_PARAMS['d_period'], help="Slow %%D")
+    parser.add_argument('--smooth', type=int, default=DEFAULT_PARAMS['smooth_k'], help="Smooth %%K")
+    parser.add_argument('--rsi', type=int, default=DEFAULT_PARAMS['rsi_period'], help="RSI 기간")
+    parser.add_argument('--oversold', type=float, default=DEFAULT_PARAMS['oversold'])
+    parser.add_argument('--overbought', type=float, default=DEFAULT_PARAMS['overbought'])
+    parser.add_argument('--commission', type=float, default=0.0, help="수수료율 (예: 0.00015)")
+    parser.add_argument('--slippage', type=float, default=0.0, help="슬리피지 비율")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="프로세스 수")
+    parser.add_argument('--out', default="scan_summary.parquet", help="요약 저장 경로 (.parquet/.csv)")
+    parser.add_argument('--signals-out', help="신호 발생 봉 저장 경로 (.parquet/.csv)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.tickers:
+        tickers = parse_tickers(args.tickers)
+    else:
+        themes = [t.strip() for t in args.themes.split(',')] if args.themes else None
+        tickers = select(load_watchlist(args.sheet), themes)
+
+    params = {'k_period': args.k, 'd_period': args.d, 'smooth_k': args.smooth,
+              'rsi_period': args.rsi, 'oversold': args.oversold, 'overbought': args.overbought}
+    summary, signals = scan(tickers, args.timeframe, params, args.commission, args.slippage,
+                            args.workers)
+
+    write_table(summary, args.out)
+    if args.signals_out:
+        write_table(signals, args.signals_out)
+
+    failed = summary['error'].notna().sum() if 'error' in summary else 0
+    print(f"{len(summary) - failed}/{len(summary)}개 종목 완료 → {args.out}")
+    return 0 if failed < len(summary) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
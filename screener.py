@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+from backtest import backtest_arrays
+from signals import crossover_masks
+from indicators import stochastic, rsi as rsi_kernel
+
+
+# 종목별 봉을 (종목 × 봉) 2차원 배열로 쌓기
+# 최신 봉 기준 오른쪽 정렬, 짧은 종목은 앞쪽을 NaN으로 채움
+def stack_bars(frames, columns=('High', 'Low', 'Close'), max_bars=None):
+    tickers = list(frames)
+    length = max((len(df) for df in frames.values()), default=0)
+    if max_bars:
+        length = min(length, max_bars)
+
+    stacked = {col: np.full((len(tickers), length), np.nan) for col in columns}
+    for row, ticker in enumerate(tickers):
+        df = frames[ticker].iloc[-length:] if length else frames[ticker].iloc[:0]
+        for col in columns:
+            stacked[col][row, length - len(df):] = df[col].to_numpy(dtype=np.float64)
+    return tickers, stacked
+
+
+def _last_valid(values):
+    # 행별 마지막 값 (오른쪽 정렬이므로 마지막 열)
+    return values[:, -1] if values.shape[1] else np.full(len(values), np.nan)
+
+
+# 백분위 순위 (0~1, NaN은 0.5)
+def _pct_rank(values, ascending=True):
+    ranks = pd.Series(values).rank(pct=True, ascending=ascending)
+    return ranks.fillna(0.5).to_numpy()
+
+
+# 전체 종목 일괄 스코어링
+# 점수: 과매도(%K 낮음), RSI 낮음, 최근 수익률, 백테스트 수익률/승률의 백분위 평균
+#       + 현재 봉 적극매수 신호 가산점
+def screen(frames, k_period, d_period, smooth_k, rsi_period, oversold, overbought,
+           return_bars=20, max_bars=None, commission=0.0, slippage=0.0):
+    tickers, bars = stack_bars(frames, max_bars=max_bars)
+    if not tickers:
+        return pd.DataFrame()
+    high, low, close = bars['High'], bars['Low'], bars['Close']
+
+    k, d = stochastic(high, low, close, k_period, d_period, smooth_k)
+    rsi = rsi_kernel(close, rsi_period)
+    buy, strong_buy, sell = crossover_masks(k, d, oversold, overbought)
+
+    last_close = _last_valid(close)
+    if close.shape[1] > return_bars:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            recent_return = (last_close / close[:, -1 - return_bars] - 1) * 100
+    else:
+        recent_return = np.full(len(tickers), np.nan)
+
+    # 백테스트는 종목별 유효 구간만 사용 (거래 횟수만큼만 반복하는 배열 엔진)
+    metrics = np.full((len(tickers), 4), np.nan)
+    for row in range(len(tickers)):
+        valid = ~np.isnan(close[row])
+        if not valid.any():
+            continue
+        start = int(np.argmax(valid))
+        result = backtest_arrays(close[row, start:], buy[row, start:], sell[row, start:],
+                                 commission, slippage)
+        metrics[row] = (result['total_return'], result['win_rate'],
+                        result['max_drawdown'], result['total_trades'])
+
+    table = pd.DataFrame({
+        'ticker': tickers,
+        'close': last_close,
+        '%K': _last_valid(k),
+        '%D': _last_valid(d),
+        'RSI': _last_valid(rsi),
+        'Strong_Buy': strong_buy[:, -1] if close.shape[1] else False,
+        'Buy_Signal': buy[:, -1] if close.shape[1] else False,
+        'Sell_Signal': sell[:, -1] if close.shape[1] else False,
+        'recent_return': recent_return,
+        'total_return': metrics[:, 0],
+        'win_rate': metrics[:, 1],
+        'max_drawdown': metrics[:, 2],
+        'total_trades': metrics[:, 3],
+    })
+
+    score = np.mean([
+        _pct_rank(table['%K'].to_numpy(), ascending=False),
+        _pct_rank(table['RSI'].to_numpy(), ascending=False),
+        _pct_rank(recent_return),
+        _pct_rank(table['total_return'].to_numpy()),
+        _pct_rank(table['win_rate'].to_numpy()),
+    ], axis=0) * 100
+    table['score'] = score + np.where(table['Strong_Buy'], 20, np.where(table['Buy_Signal'], 10, 0))
+
+    return table.sort_values('score', ascending=False).reset_index(drop=True)
@@ -0,0 +1,42 @@
+import numpy as np
+
+# 골든/데드 크로스 (배열 단위, 2차원이면 마지막 축이 시간)
+def crosses(k, d):
+    k = np.asarray(k, dtype=np.float64)
+    d = np.asarray(d, dtype=np.float64)
+
+    golden = np.zeros(k.shape, dtype=bool)
+    dead = np.zeros(k.shape, dtype=bool)
+    # NaN 비교는 False → 지표 계산 전 구간은 자연히 제외
+    golden[..., 1:] = (k[..., :-1] < d[..., :-1]) & (k[..., 1:] > d[..., 1:])
+    dead[..., 1:] = (k[..., :-1] > d[..., :-1]) & (k[..., 1:] < d[..., 1:])
+    return golden, dead
+
+
+# 골든/데드 크로스 + 과매도/과매수 조건
+# 반환: (매수, 적극매수, 매도) bool 배열
+def crossover_masks(k, d, oversold, overbought):
+    k = np.asarray(k, dtype=np.float64)
+    d = np.asarray(d, dtype=np.float64)
+    golden, dead = crosses(k, d)
+
+    buy = golden & (k <= oversold)
+    strong_buy = buy & (d <= oversold)
+    sell = dead & (k >= overbought)
+    return buy, strong_buy, sell
+
+
+# 매수/매도 신호 컬럼 추가 (신호 없는 봉은 NaN, Strong_Buy는 bool)
+# buy_price/sell_price: 신호 표시 가격 (기본: 차트 마커 위치)
+def add_signals(df, oversold, overbought, buy_price=None, sell_price=None):
+    buy, strong_buy, sell = crossover_masks(df['%K'].to_numpy(), df['%D'].to_numpy(),
+                                            oversold, overbought)
+    if buy_price is None:
+        buy_price = df['Low'] * 0.97
+    if sell_price is None:
+        sell_price = df['High'] * 1.03
+
+    df['Buy_Signal'] = np.where(buy, np.asarray(buy_price, dtype=np.float64), np.nan)
+    df['Sell_Signal'] = np.where(sell, np.asarray(sell_price, dtype=np.float64), np.nan)
+    df['Strong_Buy'] = strong_buy
+    return df
@@ -1,9 +1,9 @@
 import streamlit as st
-import FinanceDataReader as fdr
-import pandas as pd
-import pandas_ta as ta
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from providers import get_provider
+from market_data import yahoo_symbol
+from indicators import sma, stochastic
 
 # 페이지 설정
 st.set_page_config(layout="wide", page_title="AI 주식 비서 (네이버 버전)")
@@ -32,35 +32,28 @@ if st.button("🚀 일봉 정밀 분석 시작"):
     
     for ticker in tickers:
         try:
-            # .KS 같은 거 떼고 순수 코드만 추출 (네이버용)
+            # 아카이브(local:/record:)와 같은 키를 쓰도록 야후 심볼(005930.KS)로 조회
+            # (FinanceDataReader 제공자는 접미사를 떼고 종목코드로 조회)
             clean_ticker = ticker.replace('.KS', '').replace('.KQ', '')
+            symbol = yahoo_symbol(ticker)
             
-            # 데이터 가져오기 (FinanceDataReader 사용)
-            df = fdr.DataReader(clean_ticker, '2023-01-01')
+            # 데이터 가져오기 (기본 FinanceDataReader, STOCK_DATA_PROVIDER로 교체 가능)
+            df = get_provider(default="fdr").history(symbol, "1d", start='2023-01-01')
             
             if df.empty:
                 st.error(f"❌ {ticker}: 데이터가 없습니다. 코드를 확인하세요.")
                 continue
 
-            # 보조지표 계산 (pandas_ta)
+            # 보조지표 계산 (indicators 커널)
             # 이평선
-            df['MA5'] = ta.sma(df['Close'], length=5)
-            df['MA20'] = ta.sma(df['Close'], length=20)
-            df['MA60'] = ta.sma(df['Close'], length=60)
-            df['MA120'] = ta.sma(df['Close'], length=120)
+            close = df['Close'].to_numpy()
+            for window in (5, 20, 60, 120):
+                df[f'MA{window}'] = sma(close, window)
             
-            # 스토캐스틱
-            stoch = ta.stoch(df['High'], df['Low'], df['Close'], k=k_period, d=d_period)
-            # pandas_ta 컬럼명 처리
-            k_col = f'STOCHk_{k_period}_{d_period}_3'
-            d_col = f'STOCHd_{k_period}_{d_period}_3'
-            
-            if k_col not in stoch.columns:
-                 df['%K'] = stoch.iloc[:, 0]
-                 df['%D'] = stoch.iloc[:, 1]
-            else:
-                df['%K'] = stoch[k_col]
-                df['%D'] = stoch[d_col]
+            # 스토캐스틱 (Slow %K 평활 3)
+            stoch = stochastic(df['High'].to_numpy(), df['Low'].to_numpy(), close, k_period, d_period, 3)
+            df['%K'] = stoch.k
+            df['%D'] = stoch.d
 
             # 최근 데이터
             last_close = df['Close'].iloc[-1]
@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+import bar_store
+
+# 종목 마스터: 코드 → (야후 시장 접미사, 종목명, 상장 상태)
+Symbol = namedtuple("Symbol", ["suffix", "name", "status"])
+
+SYMBOL_FILE = os.path.join(bar_store.STORE_DIR, "symbols.json")
+REFRESH_SECONDS = 24 * 60 * 60
+RETRY_SECONDS = 10 * 60
+
+LISTED = "상장"
+DELISTED = "상장폐지"
+
+MARKET_SUFFIX = {"KOSPI": ".KS", "KOSDAQ": ".KQ", "KOSDAQ GLOBAL": ".KQ", "KONEX": ".KQ"}
+
+# 종목 목록을 못 받아올 때 쓰는 기본 종목명
+KOREAN_NAMES = {
+    '005930': '삼성전자', '000660': 'SK하이닉스', '035720': '카카오',
+    '035420': 'NAVER', '005380': '현대차', '000270': '기아',
+    '051910': 'LG화학', '006400': '삼성SDI', '207940': '삼성바이오로직스',
+    '068270': '셀트리온', '028260': '삼성물산', '042700': '한미반도체',
+    '009150': '삼성전기', '012330': '현대모비스', '003550': 'LG',
+    '017670': 'SK텔레콤', '033780': 'KT&G', '018260': '삼성에스디에스',
+    '096770': 'SK이노베이션', '373220': 'LG에너지솔루션', '352820': '하이브',
+    '247540': '에코프로비엠', '086520': '에코프로', '066970': '엘앤에프',
+    '161390': '한국타이어', '326030': 'SK바이오팜', '091990': '셀트리온헬스케어',
+    '055550': '신한지주', '086790': '하나금융지주', '105560': 'KB금융',
+    '316140': '우리금융지주'
+}
+
+_lock = threading.Lock()
+_index = None
+_updated = 0.0
+_refreshing = False
+
+
+def _read_file():
+    try:
+        with open(SYMBOL_FILE, encoding="utf-8") as f:
+            data = json.load(f)
+        symbols = {code: Symbol(*entry) for code, entry in data["symbols"].items()}
+        return symbols, data.get("updated", 0.0)
+    except Exception:
+        return None, 0.0
+
+
+# 저장 실패(읽기 전용 폴더, 디스크 부족)는 무시 (메모리 목록은 그대로 사용, 다음 갱신 때 다시 저장)
+def _write_file(symbols, updated):
+    try:
+        os.makedirs(os.path.dirname(SYMBOL_FILE), exist_ok=True)
+        tmp_path = f"{SYMBOL_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"updated": updated, "symbols": {k: list(v) for k, v in symbols.items()}},
+                      f, ensure_ascii=False)
+        os.replace(tmp_path, SYMBOL_FILE)
+    except OSError:
+        pass
+
+
+# KRX 상장/상장폐지 종목 목록 (FinanceDataReader)
+def fetch_listing():
+    import FinanceDataReader as fdr
+
+    symbols = {}
+    try:
+        delisted = fdr.StockListing("KRX-DELISTING")
+        code_col = "Code" if "Code" in delisted.columns else "Symbol"
+        for code, name, market in zip(delisted[code_col], delisted["Name"], delisted["Market"]):
+            symbols[str(code)] = Symbol(MARKET_SUFFIX.get(market, ""), name, DELISTED)
+    except Exception:
+        pass
+
+    listed = fdr.StockListing("KRX")
+    for code, name, market in zip(listed["Code"], listed["Name"], listed["Market"]):
+        symbols[str(code)] = Symbol(MARKET_SUFFIX.get(market, ""), name, LISTED)
+    return symbols
+
+
+def _refresh():
+    global _index, _updated, _refreshing
+    merged = None
+    try:
+        listing = fetch_listing()
+    except Exception:
+        listing = None
+    try:
+        with _lock:
+            if listing:
+                # 시장 조회로 알게 된 종목(해외 등)은 유지
+                merged = dict(_index or {})
+                merged.update(listing)
+                _index = merged
+                _updated = time.time()
+            else:
+                # 목록 조회 실패 → 잠시 후 재시도
+                _updated = time.time() - REFRESH_SECONDS + RETRY_SECONDS
+        if merged is not None:
+            _write_file(merged, _updated)
+    finally:
+        with _lock:
+            _refreshing = False
+
+
+def _ensure_loaded():
+    global _index, _updated, _refreshing
+    with _lock:
+        if _index is None:
+            _index, _updated = _read_file()
+        if _index is not None and time.time() - _updated < REFRESH_SECONDS:
+            return
+        if _refreshing:
+            return
+        _refreshing = True
+        first_load = _index is None
+        if first_load:
+            _index = {code: Symbol("", name, LISTED) for code, name in KOREAN_NAMES.items()}
+
+    if first_load:
+        _refresh()
+    else:
+        # 오래된 목록은 그대로 쓰면서 백그라운드 갱신
+        threading.Thread(target=_refresh, daemon=True).start()
+
+
+def lookup(code):
+    _ensure_loaded()
+    return _index.get(code)
+
+
+# 시장 조회/info 호출로 알게 된 종목 기록
+def remember(code, suffix, name, status=LISTED):
+    _ensure_loaded()
+    entry = Symbol(suffix, name, status)
+    with _lock:
+        if _index.get(code) == entry:
+            return
+        _index[code] = entry
+        _write_file(_index, _updated)
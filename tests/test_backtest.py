@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+from backtest import backtest_arrays, INITIAL_CAPITAL
+
+# 배열 백테스트를 원래의 봉 단위 루프(수수료/슬리피지/기간 끝 청산 포함)와 비교
+
+SEEDS = range(30)
+COSTS = [(0.0, 0.0), (0.00015, 0.0), (0.0, 0.002), (0.001, 0.003)]
+METRICS = ['total_return', 'win_rate', 'profit_loss_ratio', 'max_drawdown', 'total_trades']
+
+
+# 기준 구현: 봉마다 미보유+매수 신호면 전액 매수, 보유+매도 신호면 전량 매도
+# 기간 끝까지 보유하면 마지막 종가로 청산 (비용 포함, 자산 곡선 마지막 값도 청산 후 현금)
+def _reference(close, buy, sell, commission, slippage, initial_capital=INITIAL_CAPITAL):
+    capital = float(initial_capital)
+    position = 0
+    profits = []
+    equity_curve = []
+    for i in range(len(close)):
+        if buy[i] and position == 0:
+            buy_fill = close[i] * (1 + slippage)
+            shares = capital // (buy_fill * (1 + commission))
+            if shares > 0:
+                position = shares
+                capital -= shares * buy_fill * (1 + commission)
+        elif sell[i] and position > 0:
+            sell_fill = close[i] * (1 - slippage)
+            capital += position * sell_fill * (1 - commission)
+            profits.append((sell_fill * (1 - commission) - buy_fill * (1 + commission))
+                           / (buy_fill * (1 + commission)) * 100)
+            position = 0
+        equity_curve.append(capital + position * close[i])
+
+    open_at_end = position > 0
+    if open_at_end:
+        capital += position * close[-1] * (1 - slippage) * (1 - commission)
+        equity_curve[-1] = capital
+
+    total_return = (capital - initial_capital) / initial_capital * 100
+    if profits:
+        wins = [p for p in profits if p > 0]
+        losses = [p for p in profits if p <= 0]
+        win_rate = len(wins) / len(profits) * 100
+        avg_win = np.mean(wins) if wins else 0
+        avg_loss = abs(np.mean(losses)) if losses else 1
+        profit_loss_ratio = avg_win / avg_loss if avg_loss > 0 else 0
+        max_dd = 0
+        peak = equity_curve[0]
+        for value in equity_curve:
+            peak = max(peak, value)
+            max_dd = max(max_dd, (peak - value) / peak * 100)
+    else:
+        win_rate = 0
+        profit_loss_ratio = 0
+        max_dd = 0
+    return {
+        'total_return': total_return, 'win_rate': win_rate, 'profit_loss_ratio': profit_loss_ratio,
+        'max_drawdown': max_dd, 'total_trades': len(profits), 'equity_curve': np.array(equity_curve),
+        'trade_returns': np.array(profits) / 100, 'open_at_end': open_at_end,
+    }
+
+
+def _assert_same(close, buy, sell, commission, slippage):
+    result = backtest_arrays(close, buy, sell, commission, slippage)
+    expected = _reference(close, buy, sell, commission, slippage)
+    for m in METRICS:
+        assert result[m] == pytest.approx(expected[m], rel=1e-9, abs=1e-9), m
+    np.testing.assert_allclose(result['equity_curve'], expected['equity_curve'], rtol=1e-12)
+    np.testing.assert_allclose(result['trade_returns'], expected['trade_returns'], rtol=1e-12)
+    assert result['open_at_end'] == expected['open_at_end']
+    return result
+
+
+# 무작위 가격 + 신호 (같은 봉에 매수/매도가 함께 나오는 경우 포함)
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("commission,slippage", COSTS)
+def test_matches_reference_loop(seed, commission, slippage):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(50, 400))
+    close = np.abs(1000 + np.cumsum(rng.normal(0, 20, n))) + 1
+    buy = rng.random(n) < 0.05
+    sell = rng.random(n) < 0.05
+    _assert_same(close, buy, sell, commission, slippage)
+
+
+# 마지막 매수 뒤 매도 신호가 없으면 마지막 봉에서 청산 비용을 빼고 청산
+@pytest.mark.parametrize("commission,slippage", COSTS)
+def test_open_position_at_end(commission, slippage):
+    close = np.array([100.0, 110, 120, 90, 95, 130])
+    buy = np.array([True, False, False, True, False, False])
+    sell = np.array([False, False, True, False, False, False])
+    result = _assert_same(close, buy, sell, commission, slippage)
+    assert result['open_at_end']
+    assert result['total_trades'] == 1
+    assert result['equity_curve'][-1] == pytest.approx(INITIAL_CAPITAL * (1 + result['total_return'] / 100))
+
+
+# 1주도 못 사는 매수 신호는 건너뛰고 다음 매수 신호에서 진입
+def test_unaffordable_entry_is_skipped():
+    close = np.array([100.0, 100, 100, 1e8, 1e8, 10, 10, 20, 20])
+    buy = np.zeros(9, dtype=bool)
+    sell = np.zeros(9, dtype=bool)
+    buy[[0, 3, 5]] = True
+    sell[[2, 7]] = True
+    result = _assert_same(close, buy, sell, 0.0, 0.0)
+    assert result['total_trades'] == 2
+
+
+def test_no_signals():
+    close = np.linspace(100, 200, 20)
+    no_signal = np.zeros(20, dtype=bool)
+    result = _assert_same(close, no_signal, no_signal, 0.001, 0.001)
+    assert result['total_return'] == 0
+    np.testing.assert_array_equal(result['equity_curve'], np.full(20, float(INITIAL_CAPITAL)))
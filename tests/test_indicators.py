@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+import indicators
+
+# 지표 커널을 pandas rolling/ewm 기준 계산과 비교 (NaN 위치는 정확히 같고 값은 부동소수점 오차 이내)
+
+SEEDS = range(20)
+TOLERANCE = 1e-7
+
+
+# 무작위 가격 + 중간 NaN 구간(거래 정지), 일부는 호가 단위로 반올림해 동률이 자주 나오게
+def _bars(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(30, 400))
+    close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    if seed % 2:
+        close = np.round(close / 50) * 50
+    spread = close * rng.uniform(0.0, 0.01, n)
+    df = pd.DataFrame({'High': close + spread, 'Low': close - spread, 'Close': close})
+    gaps = rng.integers(1, n, 3)
+    df.iloc[gaps] = np.nan
+    df.iloc[n // 3:n // 3 + int(rng.integers(1, 5))] = np.nan
+    return df
+
+
+def _assert_same(actual, expected):
+    actual = np.asarray(actual, dtype=np.float64)
+    expected = np.asarray(expected, dtype=np.float64)
+    assert actual.shape == expected.shape
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    valid = ~np.isnan(expected)
+    np.testing.assert_allclose(actual[valid], expected[valid], rtol=0, atol=TOLERANCE)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("window", [1, 2, 5, 14, 60])
+def test_rolling_matches_pandas(seed, window):
+    close = _bars(seed)['Close']
+    _assert_same(indicators.sma(close.to_numpy(), window), close.rolling(window).mean())
+    _assert_same(indicators.rolling_max(close.to_numpy(), window), close.rolling(window).max())
+    _assert_same(indicators.rolling_min(close.to_numpy(), window), close.rolling(window).min())
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_stochastic_matches_pandas(seed):
+    df = _bars(seed)
+    k_period, d_period, smooth_k = 8, 5, 5
+    low_min = df['Low'].rolling(k_period).min()
+    high_max = df['High'].rolling(k_period).max()
+    raw_k = 100 * ((df['Close'] - low_min) / (high_max - low_min))
+    k = raw_k.rolling(smooth_k).mean()
+    d = k.rolling(d_period).mean()
+
+    result = indicators.stochastic(df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy(),
+                                   k_period, d_period, smooth_k)
+    _assert_same(result.k, k)
+    _assert_same(result.d, d)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("period", [2, 14])
+def test_rsi_sma_matches_pandas(seed, period):
+    close = _bars(seed)['Close']
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).rolling(period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(period).mean()
+    expected = 100 - (100 / (1 + gain / loss))
+    _assert_same(indicators.rsi(close.to_numpy(), period), expected)
+
+
+# Wilder 평활: 첫 period개 변화량 평균에서 시작해 ewm(alpha=1/period, adjust=False)
+def _wilder_reference(values, period):
+    out = pd.Series(np.nan, index=values.index)
+    seeded = values.iloc[period:].copy()
+    seeded.iloc[0] = values.iloc[1:period + 1].mean()
+    out.iloc[period:] = seeded.ewm(alpha=1 / period, adjust=False).mean()
+    return out
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("period", [2, 14, 50])
+def test_rsi_wilder_matches_ewm(seed, period):
+    rng = np.random.default_rng(seed)
+    close = pd.Series(10000 * np.exp(np.cumsum(rng.normal(0, 0.01, 600))))
+    delta = close.diff().fillna(0)
+    gain = _wilder_reference(delta.clip(lower=0), period)
+    loss = _wilder_reference(-delta.clip(upper=0), period)
+    _assert_same(indicators.rsi(close.to_numpy(), period, method="wilder"), 100 - 100 / (1 + gain / loss))
+
+
+# 길이가 다른 종목을 앞쪽 NaN으로 채운 2차원 배열: 행마다 1차원 계산과 같아야 함
+@pytest.mark.parametrize("method", ["sma", "wilder"])
+def test_padded_rows_match_single_series(method):
+    frames = [_bars(seed).dropna() for seed in range(6)]
+    length = max(len(df) for df in frames)
+    stacked = {col: np.full((len(frames), length), np.nan) for col in ('High', 'Low', 'Close')}
+    for row, df in enumerate(frames):
+        for col in stacked:
+            stacked[col][row, length - len(df):] = df[col].to_numpy()
+
+    rsi = indicators.rsi(stacked['Close'], 14, method=method)
+    stoch = indicators.stochastic(stacked['High'], stacked['Low'], stacked['Close'], 8, 5, 5)
+    for row, df in enumerate(frames):
+        tail = slice(length - len(df), None)
+        _assert_same(rsi[row, tail], indicators.rsi(df['Close'].to_numpy(), 14, method=method))
+        single = indicators.stochastic(df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy(), 8, 5, 5)
+        _assert_same(stoch.k[row, tail], single.k)
+        _assert_same(stoch.d[row, tail], single.d)
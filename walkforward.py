@@ -0,0 +1,247 @@
+import hashlib
+import json
+import os
+import threading
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+from backtest import backtest_arrays, INITIAL_CAPITAL
+from indicators import stochastic
+from signals import crossover_masks
+from optimizer import (parameter_combos, evaluate_combos, rank_results, process_pool,
+                       PARAM_COLUMNS, METRIC_COLUMNS)
+from instrumentation import timed, record_cache
+
+DEFAULT_FOLDS = 10
+# 학습 창 길이 (전체 봉 대비), 나머지를 검증 창 fold 수로 나눔
+TRAIN_FRACTION = 0.5
+# fold마다 탐색할 무작위 조합 수 (같은 seed면 같은 조합 → fold 결과 캐시 재사용)
+DEFAULT_SAMPLES = 500
+DEFAULT_SEED = 0
+# 백테스트 계산 방식이 바뀌면 올려서 예전 fold 캐시를 무효화
+CACHE_VERSION = 3
+
+# 봉 위치 기준 [train_start, train_end) 학습, [test_start, test_end) 검증
+Fold = namedtuple("Fold", ["train_start", "train_end", "test_start", "test_end"])
+# folds: fold별 선택 파라미터/학습·검증 성과 표, equity: 검증 구간을 이어 붙인 자산 곡선, stats: 안정성 통계
+WalkForward = namedtuple("WalkForward", ["folds", "equity", "stats"])
+
+_write_lock = threading.Lock()
+
+
+# 고정 길이 학습 창을 검증 창 길이만큼 밀면서 이동 (rolling)
+# 검증 창은 겹치지 않고 이어지며 마지막 fold가 최신 봉에서 끝남 (남는 앞쪽 봉은 사용 안 함)
+def make_folds(n, n_folds=DEFAULT_FOLDS, train_fraction=TRAIN_FRACTION):
+    train_bars = int(n * train_fraction)
+    test_bars = (n - train_bars) // n_folds if n_folds > 0 else 0
+    if train_bars < 2 or test_bars < 2:
+        return []
+    offset = n - train_bars - test_bars * n_folds
+    folds = []
+    for i in range(n_folds):
+        train_start = offset + i * test_bars
+        test_start = train_start + train_bars
+        folds.append(Fold(train_start, test_start, test_start, test_start + test_bars))
+    return folds
+
+
+# 파라미터 1개 세트를 검증 구간에서 평가 (지표는 학습 구간부터 계산해 워밍업 확보)
+def score_params(close, high, low, params, fold, commission=0.0, slippage=0.0):
+    window = slice(fold.train_start, fold.test_end)
+    k, d = stochastic(high[window], low[window], close[window],
+                      params['k_period'], params['d_period'], params['smooth_k'])
+    buy, strong_buy, sell = crossover_masks(k, d, params['oversold'], params['overbought'])
+    offset = fold.test_start - fold.train_start
+    return backtest_arrays(close[fold.test_start:fold.test_end], buy[offset:], sell[offset:],
+                           commission, slippage)
+
+
+def _metrics(result):
+    metrics = {m: float(result[m]) for m in METRIC_COLUMNS}
+    metrics['open_at_end'] = bool(result['open_at_end'])
+    return metrics
+
+
+# fold 1개: 학습 구간 최적화 → 1위 파라미터로 검증 구간 평가
+# 조건을 만족하는 조합이 없으면 검증 구간은 현금 보유 (자산 변화 없음)
+def run_fold(close, high, low, fold, combos, commission, slippage, sort_by, min_trades):
+    train = slice(fold.train_start, fold.train_end)
+    rows = evaluate_combos(close[train], high[train], low[train], combos, commission, slippage)
+    table = rank_results(rows, sort_by, min_trades, 1)
+    if table.empty:
+        return {'params': None, 'train': None, 'test': None,
+                'equity': [1.0] * (fold.test_end - fold.test_start)}
+
+    best = table.iloc[0]
+    params = {p: int(best[p]) for p in PARAM_COLUMNS}
+    test = score_params(close, high, low, params, fold, commission, slippage)
+    return {'params': params, 'train': {m: float(best[m]) for m in METRIC_COLUMNS},
+            'test': _metrics(test), 'equity': (test['equity_curve'] / INITIAL_CAPITAL).tolist()}
+
+
+def _cache_dir():
+    import bar_store
+
+    return os.path.join(bar_store.STORE_DIR, "walkforward")
+
+
+# fold 결과 캐시 키: fold 구간 봉 데이터 + 탐색 설정 (데이터가 같으면 다른 실행/재시작에서도 재사용)
+def _fold_key(close, high, low, fold, settings):
+    digest = hashlib.sha1(repr(settings).encode("utf-8"))
+    for values in (close, high, low):
+        digest.update(np.ascontiguousarray(values[fold.train_start:fold.test_end]).tobytes())
+    return digest.hexdigest()
+
+
+def _read_fold(key):
+    try:
+        with open(os.path.join(_cache_dir(), f"{key}.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_fold(key, result):
+    path = os.path.join(_cache_dir(), f"{key}.json")
+    try:
+        with _write_lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+# 검증 구간 자산 곡선을 이어 붙임 (fold마다 직전 fold의 최종 자산에서 시작)
+def stitch_equity(index, folds, results):
+    values = []
+    positions = []
+    capital = float(INITIAL_CAPITAL)
+    for fold, result in zip(folds, results):
+        segment = capital * np.asarray(result['equity'])
+        values.append(segment)
+        positions.append(np.arange(fold.test_start, fold.test_end))
+        capital = float(segment[-1])
+    if not values:
+        return pd.Series(dtype=np.float64)
+    return pd.Series(np.concatenate(values), index=index[np.concatenate(positions)])
+
+
+# 안정성 통계
+# wfe(walk-forward efficiency): 검증 구간 봉당 수익률 / 학습 구간 봉당 수익률 (1에 가까울수록 과적합 적음)
+# param_consistency: 가장 많이 선택된 파라미터 세트가 선택된 fold 비율
+# oos_trades: 검증 구간 거래 수 (검증 창 끝에서 보유 중이라 강제 청산한 포지션도 1건으로 셈)
+# oos_open_at_end: 그중 강제 청산으로 끝난 fold 수
+def stability_stats(folds, results, equity):
+    tested = [(fold, r) for fold, r in zip(folds, results) if r['test'] is not None]
+    test_returns = np.array([r['test']['total_return'] for fold, r in tested])
+    train_returns = np.array([r['train']['total_return'] for fold, r in tested])
+    test_bars = np.array([fold.test_end - fold.test_start for fold, r in tested])
+    train_bars = np.array([fold.train_end - fold.train_start for fold, r in tested])
+
+    if len(equity):
+        peak = np.maximum.accumulate(equity.to_numpy())
+        oos_mdd = float(((peak - equity.to_numpy()) / peak * 100).max())
+        oos_return = (float(equity.iloc[-1]) - INITIAL_CAPITAL) / INITIAL_CAPITAL * 100
+    else:
+        oos_mdd = 0.0
+        oos_return = 0.0
+
+    wfe = np.nan
+    if len(tested):
+        train_rate = (train_returns / train_bars).mean()
+        if train_rate > 0:
+            wfe = float((test_returns / test_bars).mean() / train_rate)
+
+    chosen = [tuple(r['params'][p] for p in PARAM_COLUMNS) for fold, r in tested]
+    consistency = max(chosen.count(c) for c in set(chosen)) / len(chosen) * 100 if chosen else 0.0
+
+    return {
+        'folds': len(folds),
+        'tested_folds': len(tested),
+        'oos_return': oos_return,
+        'oos_mdd': oos_mdd,
+        'fold_return_mean': float(test_returns.mean()) if len(tested) else 0.0,
+        'fold_return_std': float(test_returns.std()) if len(tested) else 0.0,
+        'positive_folds': float((test_returns > 0).mean() * 100) if len(tested) else 0.0,
+        'train_return_mean': float(train_returns.mean()) if len(tested) else 0.0,
+        'wfe': wfe,
+        'param_consistency': consistency,
+        'oos_trades': int(sum(r['test']['total_trades'] + r['test']['open_at_end'] for fold, r in tested)),
+        'oos_open_at_end': int(sum(r['test']['open_at_end'] for fold, r in tested)),
+    }
+
+
+def _fold_table(folds, results, index):
+    rows = []
+    for i, (fold, result) in enumerate(zip(folds, results), 1):
+        row = {'fold': i, 'train_from': index[fold.train_start], 'test_from': index[fold.test_start],
+               'test_to': index[fold.test_end - 1]}
+        row.update(result['params'] or {p: None for p in PARAM_COLUMNS})
+        for prefix in ('train', 'test'):
+            for m in METRIC_COLUMNS:
+                row[f'{prefix}_{m}'] = result[prefix][m] if result[prefix] else None
+        row['test_open_at_end'] = result['test']['open_at_end'] if result['test'] else None
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+# 여러 종목 워크포워드 검증 (종목×fold 단위로 프로세스 풀에 분배, fold 결과는 디스크 캐시)
+# frames: {종목: OHLC DataFrame}, 반환: {종목: WalkForward}
+def walk_forward_many(frames, n_folds=DEFAULT_FOLDS, train_fraction=TRAIN_FRACTION, grid=None,
+                      method="random", n_samples=DEFAULT_SAMPLES, seed=DEFAULT_SEED,
+                      commission=0.0, slippage=0.0, sort_by='total_return', min_trades=1,
+                      workers=None):
+    combos = parameter_combos(grid, method, n_samples, seed)
+    settings = (CACHE_VERSION, sorted(combos), commission, slippage, sort_by, min_trades)
+
+    arrays = {}
+    fold_lists = {}
+    results = {}
+    pending = {}
+    for ticker, df in frames.items():
+        close = df['Close'].to_numpy(dtype=np.float64)
+        high = df['High'].to_numpy(dtype=np.float64)
+        low = df['Low'].to_numpy(dtype=np.float64)
+        arrays[ticker] = (close, high, low)
+        fold_lists[ticker] = make_folds(len(df), n_folds, train_fraction)
+        results[ticker] = [None] * len(fold_lists[ticker])
+        for i, fold in enumerate(fold_lists[ticker]):
+            key = _fold_key(close, high, low, fold, settings)
+            cached = _read_fold(key)
+            record_cache("walkforward", cached is not None)
+            if cached is not None:
+                results[ticker][i] = cached
+            else:
+                pending[(ticker, i)] = key
+
+    if pending:
+        with timed("walkforward"), process_pool(workers) as executor:
+            futures = {}
+            for (ticker, i), key in pending.items():
+                close, high, low = arrays[ticker]
+                future = executor.submit(run_fold, close, high, low, fold_lists[ticker][i], combos,
+                                         commission, slippage, sort_by, min_trades)
+                futures[future] = (ticker, i, key)
+            for future, (ticker, i, key) in futures.items():
+                results[ticker][i] = future.result()
+                _write_fold(key, results[ticker][i])
+
+    out = {}
+    for ticker, df in frames.items():
+        folds = fold_lists[ticker]
+        equity = stitch_equity(df.index, folds, results[ticker])
+        out[ticker] = WalkForward(_fold_table(folds, results[ticker], df.index), equity,
+                                  stability_stats(folds, results[ticker], equity))
+    return out
+
+
+# 종목별 검증 구간 자산 곡선을 동일 비중으로 합침 (시작 자산 기준으로 정규화, 빈 봉은 직전 값)
+def combined_equity(walk_forwards):
+    curves = {ticker: wf.equity / INITIAL_CAPITAL for ticker, wf in walk_forwards.items() if len(wf.equity)}
+    if not curves:
+        return pd.Series(dtype=np.float64)
+    table = pd.DataFrame(curves).sort_index().ffill().fillna(1.0)
+    return table.mean(axis=1) * INITIAL_CAPITAL
@@ -0,0 +1,117 @@
+import argparse
+import json
+import os
+import sys
+import threading
+
+# 로그인 화면 전에 불러오므로 무거운 모듈(pandas, yfinance, plotly 등)은 함수 안에서 import
+
+# 사이드바 직접 입력 기본 종목
+DEFAULT_TICKERS = ["005930", "000660", "035720", "042700"]
+# 사이드바 기본 봉 (일봉)
+DEFAULT_TIMEFRAMES = ("1d",)
+
+# 마지막으로 쓴 구글 시트 URL 저장 위치 (봉 저장소 옆, 환경변수 STOCK_WARM_SHEET가 우선)
+SHEET_ENV = "STOCK_WARM_SHEET"
+
+_started = False
+_lock = threading.Lock()
+
+
+def _warm_file():
+    import bar_store
+
+    return os.path.join(bar_store.STORE_DIR, "warmup.json")
+
+
+def saved_sheet():
+    if os.environ.get(SHEET_ENV):
+        return os.environ[SHEET_ENV]
+    try:
+        with open(_warm_file(), encoding="utf-8") as f:
+            return json.load(f).get("sheet_url") or None
+    except (OSError, ValueError):
+        return None
+
+
+# 사용자가 불러온 시트를 다음 재시작 때 미리 준비하도록 기록
+def remember_sheet(sheet_url):
+    if not sheet_url or sheet_url == saved_sheet():
+        return
+    path = _warm_file()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"sheet_url": sheet_url}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+# 기본 종목 + 저장된 시트 종목의 봉을 받아 저장소/지표 캐시를 채움
+# 반환: {봉: (성공 종목 수, 실패 종목 수)}
+def warm(tickers=None, timeframes=DEFAULT_TIMEFRAMES, sheet_url=None, params=None):
+    from market_data import fetch_many
+    from pipeline import analyze
+    from scan import DEFAULT_PARAMS
+    from watchlist import load_watchlist
+    # 차트 모듈(plotly) import 비용도 로그인 전에 미리 지불
+    import charts
+
+    tickers = list(tickers or DEFAULT_TICKERS)
+    sheet_url = sheet_url or saved_sheet()
+    if sheet_url:
+        try:
+            tickers += load_watchlist(sheet_url).tickers
+        except Exception:
+            pass
+    tickers = list(dict.fromkeys(tickers))
+    params = {**DEFAULT_PARAMS, **(params or {})}
+
+    summary = {}
+    for timeframe in timeframes:
+        results, errors = fetch_many(tickers, timeframe)
+        for ticker, (df, *_) in results.items():
+            analyze(ticker, timeframe, df, params['k_period'], params['d_period'], params['smooth_k'],
+                    params['rsi_period'], params['oversold'], params['overbought'])
+        summary[timeframe] = (len(results), len(errors))
+    return summary
+
+
+def _warm_safe(**kwargs):
+    try:
+        warm(**kwargs)
+    except Exception:
+        pass
+
+
+# 프로세스당 한 번만 백그라운드에서 warm 실행 (Streamlit 재실행마다 호출해도 됨)
+def start_background(**kwargs):
+    global _started
+    with _lock:
+        if _started:
+            return False
+        _started = True
+    threading.Thread(target=_warm_safe, kwargs=kwargs, daemon=True).start()
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="기본 관심종목/저장된 시트의 봉 데이터 미리 받기 (배포 직후 실행)")
+    parser.add_argument('--tickers', help=f"쉼표로 구분한 종목코드 (기본: {','.join(DEFAULT_TICKERS)})")
+    parser.add_argument('--sheet', help="종목코드 컬럼이 있는 구글 시트 URL 또는 CSV 경로 (기본: 마지막으로 쓴 시트)")
+    parser.add_argument('--timeframes', default=','.join(DEFAULT_TIMEFRAMES),
+                        help="쉼표로 구분한 봉 (예: 1d,5m)")
+    args = parser.parse_args(argv)
+
+    tickers = [t.strip() for t in args.tickers.split(',') if t.strip()] if args.tickers else None
+    timeframes = [t.strip() for t in args.timeframes.split(',') if t.strip()]
+    summary = warm(tickers, timeframes, args.sheet)
+    for timeframe, (done, failed) in summary.items():
+        print(f"{timeframe}: {done}개 완료, {failed}개 실패")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
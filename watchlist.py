@@ -0,0 +1,158 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import urllib.request
+from collections import namedtuple
+from urllib.error import HTTPError
+import pandas as pd
+
+# 관심종목 목록: 전체 종목코드, 테마 → 종목코드 목록, 내용 해시(바뀌었는지 비교용)
+Watchlist = namedtuple("Watchlist", ["tickers", "themes", "version"])
+
+# 이 시간 안에 확인한 시트는 다시 요청하지 않음 (초)
+REFRESH_SECONDS = 600
+REQUEST_TIMEOUT = 10
+
+_memory = {}
+_lock = threading.Lock()
+
+
+# 구글 시트 공유 링크 → CSV 내보내기 URL (그 외 URL/로컬 경로는 그대로)
+def sheet_csv_url(sheet_url):
+    if '/d/' in sheet_url:
+        # https://docs.google.com/spreadsheets/d/[ID]/edit...
+        sheet_id = sheet_url.split('/d/')[1].split('/')[0]
+        return f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv"
+    return sheet_url
+
+
+def _is_remote(source):
+    return source.startswith(("http://", "https://"))
+
+
+def _cache_path(source):
+    import bar_store
+
+    name = hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(bar_store.STORE_DIR, "watchlists", f"{name}.json")
+
+
+def _read_cache(source):
+    try:
+        with open(_cache_path(source), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(source, entry):
+    path = _cache_path(source)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+# CSV 내용 → (전체 종목코드, 테마별 종목코드) (종목코드는 앞자리 0이 빠지지 않게 문자열로)
+def build_index(body):
+    df = pd.read_csv(io.BytesIO(body), dtype={'종목코드': str})
+    df = df[df['종목코드'].notna()]
+    codes = df['종목코드'].astype(str).str.strip()
+    tickers = list(dict.fromkeys(code for code in codes if code))
+
+    themes = {}
+    if '테마' in df.columns:
+        for theme, code in zip(df['테마'], codes):
+            if pd.isna(theme) or not code:
+                continue
+            members = themes.setdefault(str(theme), [])
+            if code not in members:
+                members.append(code)
+    return tickers, themes
+
+
+# 원본 조회: 원격은 ETag/Last-Modified 조건부 요청, 로컬 파일은 수정 시각/크기 비교
+# 반환: (본문 또는 None(바뀌지 않음), 다음 조건부 요청에 쓸 검증값)
+def _fetch_source(source, validators):
+    if not _is_remote(source):
+        stat = os.stat(source)
+        stamp = f"{stat.st_mtime_ns}:{stat.st_size}"
+        if stamp == validators.get("stamp"):
+            return None, validators
+        with open(source, "rb") as f:
+            return f.read(), {"stamp": stamp}
+
+    request = urllib.request.Request(source)
+    if validators.get("etag"):
+        request.add_header("If-None-Match", validators["etag"])
+    if validators.get("last_modified"):
+        request.add_header("If-Modified-Since", validators["last_modified"])
+    try:
+        with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+            body = response.read()
+            headers = response.headers
+    except HTTPError as e:
+        if e.code == 304:
+            return None, validators
+        raise
+    return body, {"etag": headers.get("ETag"), "last_modified": headers.get("Last-Modified")}
+
+
+def _to_watchlist(entry):
+    return Watchlist(entry["tickers"], entry["themes"], entry["hash"])
+
+
+# 관심종목 시트 불러오기 (구글 시트 URL, CSV URL, 로컬 CSV 경로)
+# 메모리 → 디스크 캐시 순으로 확인하고, max_age가 지났으면 조건부 요청으로 갱신
+# 내용이 같으면(해시 동일) 다시 파싱하지 않음, 갱신 실패 시 캐시된 목록 사용 (확인 시각은 갱신)
+def load_watchlist(sheet_url, max_age=REFRESH_SECONDS):
+    source = sheet_csv_url(sheet_url.strip())
+    with _lock:
+        entry = _memory.get(source)
+    if entry is None:
+        entry = _read_cache(source)
+    if entry is not None and time.time() - entry["checked"] < max_age:
+        with _lock:
+            _memory[source] = entry
+        return _to_watchlist(entry)
+
+    try:
+        body, validators = _fetch_source(source, entry["validators"] if entry else {})
+    except Exception:
+        if entry is None:
+            raise
+        # 바뀌지 않은 것으로 보고 확인 시각만 갱신 (장애 중에도 max_age 동안은 다시 요청하지 않음)
+        body, validators = None, entry["validators"]
+
+    if body is not None:
+        digest = hashlib.sha256(body).hexdigest()
+        if entry is None or digest != entry["hash"]:
+            tickers, themes = build_index(body)
+            entry = {"source": source, "hash": digest, "tickers": tickers, "themes": themes}
+    entry = {**entry, "validators": validators, "checked": time.time()}
+    _write_cache(source, entry)
+    with _lock:
+        _memory[source] = entry
+    return _to_watchlist(entry)
+
+
+# 선택한 테마의 종목코드 (중복 제거, 시트 순서 유지), themes가 없으면 전체
+def select(watchlist, themes=None):
+    if not themes:
+        return list(watchlist.tickers)
+    tickers = []
+    for theme in themes:
+        tickers.extend(watchlist.themes.get(theme, []))
+    return list(dict.fromkeys(tickers))
+
+
+# 직접 입력한 종목 문자열 → 종목코드 목록
+def parse_tickers(text):
+    return list(dict.fromkeys(t.strip() for t in text.split(',') if t.strip()))